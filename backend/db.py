@@ -183,38 +183,61 @@ class DatabaseManager:
             logger.error(f"Failed to get products: {e}")
             return []
     
+    # Columns written by export_to_csv, in output order
+    CSV_FIELDS = (
+        'product_url', 'platform', 'title', 'brand', 'price', 'mrp',
+        'net_quantity', 'manufacturer', 'country_of_origin', 
+        'compliance_status', 'compliance_score', 'issues_found',
+        'description', 'ocr_text', 'extracted_at'
+    )
+
     def export_to_csv(self, output_path: str = "exported_products.csv"):
-        """Export all products to a CSV file."""
+        """Export all products to a CSV file.
+
+        Rows are streamed from a single cursor straight into the CSV writer, so
+        the table is scanned once and never materialized in memory.
+        """
         import csv
         
+        conn = None
         try:
-            products = self.get_all_products()
-            if not products:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.execute(
+                f"SELECT {', '.join(self.CSV_FIELDS)} FROM products ORDER BY extracted_at DESC"
+            )
+            row = cursor.fetchone()
+            if row is None:
                 logger.warning("No products to export")
                 return None
             
-            # Define CSV columns
-            fieldnames = [
-                'product_url', 'platform', 'title', 'brand', 'price', 'mrp',
-                'net_quantity', 'manufacturer', 'country_of_origin', 
-                'compliance_status', 'compliance_score', 'issues_found',
-                'description', 'ocr_text', 'extracted_at'
-            ]
-            
+            issues_idx = self.CSV_FIELDS.index('issues_found')
+            count = 0
             with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
+                writer = csv.writer(csvfile)
+                writer.writerow(self.CSV_FIELDS)
                 
-                for product in products:
-                    # Convert lists to readable strings
-                    if isinstance(product.get('issues_found'), list):
-                        product['issues_found'] = '; '.join(product['issues_found'])
+                while row is not None:
+                    issues = row[issues_idx]
+                    if issues:
+                        # Stored as JSON; lists become readable strings
+                        try:
+                            issues = json.loads(issues)
+                        except (TypeError, ValueError):
+                            pass
+                        if isinstance(issues, list):
+                            issues = '; '.join(issues)
+                        row = row[:issues_idx] + (issues,) + row[issues_idx + 1:]
                     
-                    writer.writerow(product)
+                    writer.writerow(row)
+                    count += 1
+                    row = cursor.fetchone()
             
-            logger.info(f"Exported {len(products)} products to {output_path}")
+            logger.info(f"Exported {count} products to {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"Failed to export to CSV: {e}")
             return None
+        finally:
+            if conn is not None:
+                conn.close()
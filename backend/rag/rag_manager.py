@@ -20,16 +20,18 @@ class RAGManager:
     Orchestrates knowledge base, vector store, OCR correction, and field extraction
     """
     
-    def __init__(self, kb_dir: str = "knowledge_base", index_dir: str = "rag_index"):
+    def __init__(self, kb_dir: str = "knowledge_base", index_dir: str = "rag_index", encode_workers: int = 1):
         """
         Initialize RAG Manager
         
         Args:
             kb_dir: Knowledge base directory
             index_dir: Directory to save/load vector index
+            encode_workers: CPU processes used for embedding when building the index
         """
         self.kb_dir = Path(kb_dir)
         self.index_dir = Path(index_dir)
+        self.encode_workers = encode_workers
         
         # Components
         self.kb_builder = None
@@ -59,7 +61,7 @@ class RAGManager:
         
         # Step 2: Initialize or load vector store
         logger.info("🔍 Setting up vector store...")
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(encode_workers=self.encode_workers)
         
         if self.index_dir.exists() and not force_rebuild:
             # Load existing index
@@ -12,20 +12,25 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Below this many documents a worker pool costs more to start than it saves
+MULTI_PROCESS_MIN_DOCS = 1000
+
 class VectorStore:
     """
     Manage FAISS vector store for semantic search
     Uses all-MiniLM-L6-v2 for fast, accurate embeddings (offline)
     """
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", encode_workers: int = 1):
         """
         Initialize vector store
         
         Args:
             model_name: Sentence transformer model name
+            encode_workers: CPU processes used to embed large corpora in build_index
         """
         self.model_name = model_name
+        self.encode_workers = encode_workers
         self.model = None
         self.dimension = 384  # all-MiniLM-L6-v2 dimension
         self.index = None
@@ -67,14 +72,23 @@ class VectorStore:
         
         # Generate embeddings
         logger.info("Generating embeddings...")
-        embeddings = self.model.encode(
-            documents, 
-            show_progress_bar=True,
-            convert_to_numpy=True
-        )
-        embeddings = embeddings.astype('float32')
-        
-        # Create FAISS index (exact search for maximum accuracy)
+        if self.encode_workers > 1 and len(documents) >= MULTI_PROCESS_MIN_DOCS:
+            # Shard the corpus across CPU worker processes, each with its own model copy
+            logger.info(f"Encoding with {self.encode_workers} worker processes...")
+            pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.encode_workers)
+            try:
+                embeddings = self.model.encode_multi_process(documents, pool)
+            finally:
+                self.model.stop_multi_process_pool(pool)
+        else:
+            embeddings = self.model.encode(
+                documents, 
+                show_progress_bar=True,
+                convert_to_numpy=True
+            )
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        
+        # Create FAISS index (exact search for maximum accuracy); one bulk add
         logger.info("Creating FAISS index...")
         self.index = faiss.IndexFlatL2(self.dimension)
         self.index.add(embeddings)
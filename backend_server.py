@@ -1,17 +1,39 @@
 """
 PackNetra Backend Server - Flask API
 Integrates with the frontend and provides all necessary endpoints
+
+Production (needs: pip install gunicorn gevent):
+    BHARATVISION_GEVENT=1 gunicorn -k gevent -w $(nproc) --worker-connections 1000 backend_server:app
 """
 
-from flask import Flask, jsonify, request, send_file
+import os
+
+# Cooperative I/O for gevent workers; must run before anything else imports socket/threading
+if os.environ.get('BHARATVISION_GEVENT') == '1':
+    try:
+        from gevent import monkey
+    except ImportError as e:
+        raise ImportError(
+            "BHARATVISION_GEVENT=1 requires gevent (and gunicorn to serve). "
+            "Install with: pip install gunicorn gevent"
+        ) from e
+    monkey.patch_all()
+
+from flask import Flask, jsonify, request, Response, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-import os
+import io
+import csv
 import logging
 from datetime import datetime
 import sys
 import json
+import itertools
+import hashlib
+import shutil
+import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(__file__))
@@ -35,6 +57,58 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+_UPLOAD_DIR = Path(UPLOAD_FOLDER)
+
+def _stream_fileno(stream):
+    """Return the OS file descriptor behind an upload stream, or None if it lives in memory"""
+    # Werkzeug spools uploads into a SpooledTemporaryFile; calling fileno() on one still
+    # in memory would roll it over to disk, writing the upload twice
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        return None
+    fileno = getattr(stream, 'fileno', None)
+    if fileno is None:
+        return None
+    try:
+        return fileno()
+    except (io.UnsupportedOperation, AttributeError, OSError):
+        return None
+
+def _fast_save(file, filepath):
+    """Save an upload, copying in-kernel with sendfile when it is backed by a real file"""
+    stream = file.stream
+    src_fd = _stream_fileno(stream)
+    # Write to a private temp file and rename it into place, so concurrent saves of the
+    # same name (other requests, other pool threads) never interleave in one file
+    filepath = Path(filepath)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f'.{filepath.name}.', suffix='.part')
+    try:
+        with os.fdopen(tmp_fd, 'wb') as dst:
+            if src_fd is not None and hasattr(os, 'sendfile'):
+                offset = stream.tell()
+                size = os.fstat(src_fd).st_size
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            else:
+                shutil.copyfileobj(stream, dst, length=1 << 20)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; match a plain open()
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# Shared pool for upload writes so batch requests don't save files one by one
+_upload_executor = ThreadPoolExecutor(max_workers=8)
+
+def _save_uploads(uploads):
+    """Write a batch of (FileStorage, path) pairs in one submission and wait for all of them"""
+    # Same target twice in one batch: only the last file survives, as with sequential saves
+    latest = {filepath: file for file, filepath in uploads}
+    futures = [_upload_executor.submit(_fast_save, file, filepath) for filepath, file in latest.items()]
+    for future in futures:
+        future.result()
 
 # Initialize logger
 logging.basicConfig(level=logging.INFO)
@@ -63,6 +137,114 @@ MOCK_VIOLATIONS = [
     {"state": "Delhi", "count": 315, "percentage": 35, "trend": "↑ 2%"},
 ]
 
+MOCK_STATS = {
+    'totalScans': 12840,
+    'complianceRate': 88.5,
+    'violations': 1456,
+    'activeDevices': 3,
+    'trend': {
+        'scans': 8.6,
+        'compliance': -2.1,
+        'violations': 12.0
+    }
+}
+
+MOCK_COMPLIANCE_TREND = {
+    'labels': ['Week 1', 'Week 2', 'Week 3', 'Week 4', 'Week 5', 'Week 6'],
+    'data': [82, 84, 85, 86, 87, 88.5],
+    'period': 'Last 6 weeks'
+}
+
+MOCK_CATEGORY_DISTRIBUTION = {
+    'labels': ['Food', 'Cosmetics', 'Pharma', 'Chemicals'],
+    'data': [40, 30, 20, 10]
+}
+
+MOCK_SETTINGS = {
+    'sensitivity': 'medium',
+    'notifications': True,
+    'theme': 'light',
+    'language': 'en'
+}
+
+def _dumps(obj):
+    """Serialize to compact JSON bytes"""
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _json_response(body, status=200):
+    """Wrap pre-serialized JSON bytes in a response"""
+    return Response(body, status=status, mimetype='application/json')
+
+# Mock payloads serialized once at startup; 'products' is refreshed by create_product
+_CACHED = {
+    'stats': _dumps(MOCK_STATS),
+    'products': _dumps(MOCK_PRODUCTS),
+    'violations': _dumps(MOCK_VIOLATIONS),
+    'devices': _dumps(MOCK_DEVICES),
+    'compliance_trend': _dumps(MOCK_COMPLIANCE_TREND),
+    'category_distribution': _dumps(MOCK_CATEGORY_DISTRIBUTION),
+    'settings': _dumps(MOCK_SETTINGS),
+}
+
+# Validators for the cached payloads, kept in step with _CACHED
+_ETAGS = {key: hashlib.blake2b(body, digest_size=8).hexdigest() for key, body in _CACHED.items()}
+
+def _set_cached(key, obj):
+    """Re-serialize a cached payload and refresh its ETag"""
+    body = _dumps(obj)
+    _CACHED[key] = body
+    _ETAGS[key] = hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def _cached_json(key, max_age=None):
+    """
+    Serve a cached payload with an ETag, answering 304 when the client already has it.
+    Mutable collections are revalidated on every use (no-cache); pass max_age only
+    for payloads that never change at runtime.
+    """
+    response = _json_response(_CACHED[key])
+    response.set_etag(_ETAGS[key])
+    response.headers['Cache-Control'] = f'public, max-age={max_age}' if max_age else 'no-cache'
+    return response.make_conditional(request)
+
+# Heatmap body around its per-request timestamp
+_HEATMAP_PREFIX = b'{"states":' + _CACHED['violations'] + b',"lastUpdated":"'
+_HEATMAP_SUFFIX = b'","period":"Last 30 days"}'
+
+# ID indexes for O(1) lookups; _PRODUCTS_BY_ID is kept in step by create_product
+_PRODUCTS_BY_ID = {p['id']: p for p in MOCK_PRODUCTS}
+_DEVICES_BY_ID = {d['id']: d for d in MOCK_DEVICES}
+
+# Next product id; itertools.count increments atomically under the GIL
+_next_product_id = itertools.count(start=max(p['id'] for p in MOCK_PRODUCTS) + 1)
+
+def _search_key(product):
+    """Lowercased name/brand haystack used by /api/search"""
+    return f"{product['name'] or ''}\0{product['brand'] or ''}".lower()
+
+# Search haystacks, computed once per _products_version instead of per request
+_SEARCH_CACHE = {'version': None, 'rows': []}
+
+def _search_rows():
+    """(product, haystack) pairs for /api/search, rebuilt after MOCK_PRODUCTS changes"""
+    if _SEARCH_CACHE['version'] != _products_version:
+        _SEARCH_CACHE['rows'] = [(p, _search_key(p)) for p in MOCK_PRODUCTS]
+        _SEARCH_CACHE['version'] = _products_version
+    return _SEARCH_CACHE['rows']
+
+# Serialized export payloads, rebuilt only when MOCK_PRODUCTS changes
+_EXPORT_CACHE = {'csv': None, 'json': None}
+_products_version = 0
+
+def _build_export(format_type):
+    """Serialize MOCK_PRODUCTS for the export endpoint"""
+    if format_type == 'csv':
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(['Product Name', 'Brand', 'Category', 'Compliant'])
+        writer.writerows((p['name'], p['brand'], p['category'], p['compliant']) for p in MOCK_PRODUCTS)
+        return buf.getvalue().encode('utf-8')
+    return json.dumps(MOCK_PRODUCTS, indent=2).encode('utf-8')
+
 # ==================== HEALTH CHECK ====================
 
 @app.route('/api/health', methods=['GET'])
@@ -70,7 +252,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': g.now_iso,
         'version': '1.0.0',
         'service': 'PackNetra Backend'
     }), 200
@@ -80,29 +262,19 @@ def health_check():
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get dashboard statistics"""
-    return jsonify({
-        'totalScans': 12840,
-        'complianceRate': 88.5,
-        'violations': 1456,
-        'activeDevices': 3,
-        'trend': {
-            'scans': 8.6,
-            'compliance': -2.1,
-            'violations': 12.0
-        }
-    }), 200
+    return _json_response(_CACHED['stats'])
 
 # ==================== PRODUCTS ENDPOINTS ====================
 
 @app.route('/api/products', methods=['GET'])
 def get_products():
     """Get all products"""
-    return jsonify(MOCK_PRODUCTS), 200
+    return _cached_json('products')
 
 @app.route('/api/products/<int:product_id>', methods=['GET'])
 def get_product(product_id):
     """Get specific product"""
-    product = next((p for p in MOCK_PRODUCTS if p['id'] == product_id), None)
+    product = _PRODUCTS_BY_ID.get(product_id)
     if not product:
         return jsonify({'error': 'Product not found'}), 404
     return jsonify(product), 200
@@ -110,15 +282,19 @@ def get_product(product_id):
 @app.route('/api/products', methods=['POST'])
 def create_product():
     """Create new product"""
+    global _products_version
     data = request.json
     new_product = {
-        'id': max([p['id'] for p in MOCK_PRODUCTS]) + 1,
+        'id': next(_next_product_id),
         'name': data.get('name'),
         'brand': data.get('brand'),
         'category': data.get('category'),
         'compliant': True
     }
     MOCK_PRODUCTS.append(new_product)
+    _PRODUCTS_BY_ID[new_product['id']] = new_product
+    _set_cached('products', MOCK_PRODUCTS)
+    _products_version += 1
     return jsonify(new_product), 201
 
 # ==================== VALIDATION/SCANNING ENDPOINTS ====================
@@ -137,13 +313,13 @@ def validate_image():
         return jsonify({'error': 'No file selected'}), 400
 
     filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
+    filepath = _UPLOAD_DIR / filename
+    _fast_save(file, filepath)
 
     # Mock validation result
     result = {
         'filename': filename,
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': g.now_iso,
         'compliant': True,
         'confidence': 92,
         'details': 'Product labeling meets all compliance requirements',
@@ -157,7 +333,7 @@ def validate_image():
         }
     }
 
-    logger.info(f"Validated image: {filename}")
+    logger.info("Validated image: %s", filename)
     return jsonify(result), 200
 
 @app.route('/api/batch-process', methods=['POST'])
@@ -172,14 +348,16 @@ def batch_process():
 
     results = []
     compliant_count = 0
+    uploads = []
+    upload_dir = _UPLOAD_DIR
 
     for file in files:
         if file.filename == '':
             continue
 
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        filepath = upload_dir / filename
+        uploads.append((file, filepath))
 
         # Mock validation
         is_compliant = len(filename) % 2 == 0
@@ -193,12 +371,14 @@ def batch_process():
             'details': 'Compliant' if is_compliant else 'Missing MRP'
         })
 
+    _save_uploads(uploads)
+
     return jsonify({
         'total': len(results),
         'compliant': compliant_count,
         'violations': len(results) - compliant_count,
         'items': results,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': g.now_iso
     }), 200
 
 # ==================== VIOLATIONS ENDPOINTS ====================
@@ -206,28 +386,24 @@ def batch_process():
 @app.route('/api/violations', methods=['GET'])
 def get_violations():
     """Get violations data"""
-    return jsonify(MOCK_VIOLATIONS), 200
+    return _cached_json('violations')
 
 @app.route('/api/violations/heatmap', methods=['GET'])
 def get_violations_heatmap():
     """Get state-wise violations heatmap"""
-    return jsonify({
-        'states': MOCK_VIOLATIONS,
-        'lastUpdated': datetime.now().isoformat(),
-        'period': 'Last 30 days'
-    }), 200
+    return _json_response(_HEATMAP_PREFIX + g.now_iso.encode('ascii') + _HEATMAP_SUFFIX)
 
 # ==================== DEVICES ENDPOINTS ====================
 
 @app.route('/api/devices', methods=['GET'])
 def get_devices():
     """Get all devices"""
-    return jsonify(MOCK_DEVICES), 200
+    return _cached_json('devices')
 
 @app.route('/api/devices/<int:device_id>', methods=['GET'])
 def get_device(device_id):
     """Get specific device"""
-    device = next((d for d in MOCK_DEVICES if d['id'] == device_id), None)
+    device = _DEVICES_BY_ID.get(device_id)
     if not device:
         return jsonify({'error': 'Device not found'}), 404
     return jsonify(device), 200
@@ -235,15 +411,12 @@ def get_device(device_id):
 @app.route('/api/devices/<int:device_id>/status', methods=['GET'])
 def get_device_status(device_id):
     """Get device status"""
-    device = next((d for d in MOCK_DEVICES if d['id'] == device_id), None)
+    device = _DEVICES_BY_ID.get(device_id)
     if not device:
         return jsonify({'error': 'Device not found'}), 404
 
     return jsonify({
-        'id': device['id'],
-        'name': device['name'],
-        'online': device['online'],
-        'lastSync': device['lastSync'],
+        **device,
         'cpuUsage': 45.2,
         'memoryUsage': 62.8,
         'storageUsage': 78.5,
@@ -260,8 +433,7 @@ def search_products():
     if not query:
         return jsonify([]), 200
 
-    results = [p for p in MOCK_PRODUCTS 
-               if query in p['name'].lower() or query in p['brand'].lower()]
+    results = [p for p, haystack in _search_rows() if query in haystack]
     return jsonify(results), 200
 
 # ==================== USER DASHBOARD ENDPOINTS ====================
@@ -297,8 +469,8 @@ def admin_dashboard():
         'systemHealth': 98.5,
         'activeUsers': 45,
         'recentActivity': [
-            {'user': 'inspector1', 'action': 'scan_completed', 'timestamp': datetime.now().isoformat()},
-            {'user': 'inspector2', 'action': 'batch_process', 'timestamp': datetime.now().isoformat()},
+            {'user': 'inspector1', 'action': 'scan_completed', 'timestamp': g.now_iso},
+            {'user': 'inspector2', 'action': 'batch_process', 'timestamp': g.now_iso},
         ]
     }), 200
 
@@ -310,61 +482,49 @@ def export_data():
     format_type = request.args.get('format', 'csv')
 
     if format_type == 'csv':
-        data = "Product Name,Brand,Category,Compliant\n"
-        for product in MOCK_PRODUCTS:
-            data += f"{product['name']},{product['brand']},{product['category']},{product['compliant']}\n"
         filename = 'products.csv'
         mimetype = 'text/csv'
     elif format_type == 'json':
-        data = json.dumps(MOCK_PRODUCTS, indent=2)
         filename = 'products.json'
         mimetype = 'application/json'
     else:
         return jsonify({'error': 'Invalid format'}), 400
 
-    # Create temporary file
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    with open(filepath, 'w') as f:
-        f.write(data)
+    cached = _EXPORT_CACHE[format_type]
+    if cached is None or cached[0] != _products_version:
+        cached = (_products_version, _build_export(format_type))
+        _EXPORT_CACHE[format_type] = cached
 
-    return send_file(filepath, mimetype=mimetype, as_attachment=True, download_name=filename), 200
+    return Response(
+        cached[1],
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    ), 200
 
 # ==================== ANALYTICS ENDPOINTS ====================
 
 @app.route('/api/analytics/compliance-trend', methods=['GET'])
 def compliance_trend():
     """Get compliance trend data"""
-    return jsonify({
-        'labels': ['Week 1', 'Week 2', 'Week 3', 'Week 4', 'Week 5', 'Week 6'],
-        'data': [82, 84, 85, 86, 87, 88.5],
-        'period': 'Last 6 weeks'
-    }), 200
+    return _cached_json('compliance_trend', max_age=60)
 
 @app.route('/api/analytics/category-distribution', methods=['GET'])
 def category_distribution():
     """Get category distribution"""
-    return jsonify({
-        'labels': ['Food', 'Cosmetics', 'Pharma', 'Chemicals'],
-        'data': [40, 30, 20, 10]
-    }), 200
+    return _cached_json('category_distribution', max_age=60)
 
 # ==================== SETTINGS ENDPOINTS ====================
 
 @app.route('/api/settings', methods=['GET'])
 def get_settings():
     """Get user settings"""
-    return jsonify({
-        'sensitivity': 'medium',
-        'notifications': True,
-        'theme': 'light',
-        'language': 'en'
-    }), 200
+    return _json_response(_CACHED['settings'])
 
 @app.route('/api/settings', methods=['POST'])
 def save_settings():
     """Save user settings"""
     settings = request.json
-    logger.info(f"Settings saved: {settings}")
+    logger.info("Settings saved: %s", settings)
     return jsonify({'message': 'Settings saved successfully', 'settings': settings}), 200
 
 # ==================== WEB CRAWLER ENDPOINTS ====================
@@ -373,7 +533,7 @@ def save_settings():
 def start_crawler():
     """Start web crawler"""
     data = request.json
-    logger.info(f"Starting crawler with config: {data}")
+    logger.info("Starting crawler with config: %s", data)
     
     return jsonify({
         'status': 'started',
@@ -390,7 +550,7 @@ def crawler_status(crawler_id):
         'progress': 65,
         'itemsProcessed': 234,
         'itemsFound': 156,
-        'startTime': datetime.now().isoformat(),
+        'startTime': g.now_iso,
         'estimatedTimeRemaining': '15 minutes'
     }), 200
 
@@ -420,14 +580,21 @@ def not_found(error):
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"Internal server error: {error}")
+    logger.error("Internal server error: %s", error)
     return jsonify({'error': 'Internal server error', 'message': 'An unexpected error occurred'}), 500
 
 # ==================== MIDDLEWARE ====================
 
+@app.before_request
+def stamp_request():
+    # One timestamp per request, shared by every field that reports it
+    g.now_iso = datetime.now().isoformat()
+
 @app.before_request
 def log_request():
-    logger.info(f"{request.method} {request.path}")
+    # Skip the request attribute lookups entirely when INFO is filtered out
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s %s", request.method, request.path)
 
 @app.after_request
 def add_headers(response):
@@ -438,10 +605,11 @@ def add_headers(response):
 # ==================== MAIN ====================
 
 if __name__ == '__main__':
+    # Development server only; use the gunicorn command in the module docstring in production
     logger.info("Starting BharatVision Backend Server...")
     app.run(
         host='0.0.0.0',
         port=8080,
-        debug=True,
+        debug=os.environ.get('FLASK_DEBUG', '0') == '1',
         threaded=True
     )
@@ -3,6 +3,7 @@ Build RAG Index - Simplified version without backend imports
 Run this script to initialize the RAG system
 """
 
+import os
 import sys
 import logging
 from pathlib import Path
@@ -34,7 +35,8 @@ def main():
         logger.info("Initializing RAG Manager...")
         rag = RAGManager(
             kb_dir="knowledge_base",
-            index_dir="rag_index"
+            index_dir="rag_index",
+            encode_workers=os.cpu_count() or 1
         )
         
         # Build index
@@ -6,6 +6,11 @@
 import sys
 import importlib
 
-# Force reload of crawler module
-if 'backend.crawler' in sys.modules:
-    importlib.reload(sys.modules['backend.crawler'])
+CACHE_BUSTER_VERSION = "2.0.2"
+
+# Force reload of crawler module, at most once per process per cache-buster version
+# (Streamlit re-imports this on every rerun and a full reload re-executes the module body)
+_crawler = sys.modules.get('backend.crawler')
+if _crawler is not None and getattr(_crawler, '_cache_buster_version', None) != CACHE_BUSTER_VERSION:
+    _crawler = importlib.reload(_crawler)
+    _crawler._cache_buster_version = CACHE_BUSTER_VERSION
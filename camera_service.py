@@ -34,6 +34,9 @@ class CameraService:
         self.is_running = False
         self.frame_buffer = None
         self.lock = threading.Lock()
+        # Reused BGR/RGB destinations for retrieve/cvtColor, sized to the first frame
+        self._bgr_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
         
     def initialize_camera(self) -> bool:
         """
@@ -55,10 +58,9 @@ class CameraService:
             self.cap.set(cv2.CAP_PROP_FPS, 30)
             self.cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
             
-            # Warm up camera
+            # Warm up camera (grab advances frames without decoding them into arrays)
             for _ in range(5):
-                ret, _ = self.cap.read()
-                if not ret:
+                if not self.cap.grab():
                     raise ValueError("Failed to read from camera during warmup")
             
             self.is_running = True
@@ -72,6 +74,9 @@ class CameraService:
         """
         Capture a single frame from camera
         
+        The returned array is a buffer reused across calls; copy it if it
+        must outlive the next capture.
+        
         Returns:
             np.ndarray: Captured frame or None if failed
         """
@@ -79,13 +84,19 @@ class CameraService:
             return None
         
         try:
-            ret, frame = self.cap.read()
+            # grab + retrieve into the pinned buffer avoids a fresh ndarray per frame
+            if not self.cap.grab():
+                raise ValueError("Failed to capture frame")
+            ret, frame = self.cap.retrieve(self._bgr_buf)
             
             if not ret:
                 raise ValueError("Failed to capture frame")
+            self._bgr_buf = frame
             
             # Ensure frame is in RGB format for Streamlit
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
             
             with self.lock:
                 self.frame_buffer = frame_rgb
@@ -212,9 +223,11 @@ def create_camera_placeholder_image(width: int = 320, height: int = 240) -> Imag
     # Create a gradient placeholder
     img_array = np.zeros((height, width, 3), dtype=np.uint8)
     
-    # Create gradient background
-    for i in range(height):
-        img_array[i, :] = [100 + i // 3, 150 + i // 4, 200 + i // 5]
+    # Create gradient background (one broadcast per channel instead of a row loop)
+    rows = np.arange(height, dtype=np.uint16)[:, None]
+    img_array[..., 0] = (100 + rows // 3).astype(np.uint8)
+    img_array[..., 1] = (150 + rows // 4).astype(np.uint8)
+    img_array[..., 2] = (200 + rows // 5).astype(np.uint8)
     
     # Add text overlay
     img_pil = Image.fromarray(img_array)
@@ -1,17 +1,61 @@
 #!/usr/bin/env python3
-"""Simple HTTP Server for serving the HTML frontend"""
+"""HTTP Server for serving the HTML frontend
 
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+Uses uvicorn + Starlette StaticFiles when available (async I/O, sendfile,
+ETag/Last-Modified, gzip); falls back to the stdlib server otherwise.
+"""
+
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import os
+import socket
 import sys
 
+try:
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.middleware.gzip import GZipMiddleware
+    from starlette.routing import Mount
+    from starlette.staticfiles import StaticFiles
+    ASGI_AVAILABLE = True
+except ImportError:
+    ASGI_AVAILABLE = False
+
 PORT = 8080
 SERVE_DIR = os.path.join(os.path.dirname(__file__), 'frontend', 'public')
 
+def create_app():
+    """Build the Starlette app serving SERVE_DIR"""
+    return Starlette(
+        routes=[Mount('/', app=StaticFiles(directory=SERVE_DIR, html=True))],
+        middleware=[
+            Middleware(
+                CORSMiddleware,
+                allow_origins=['*'],
+                allow_methods=['GET', 'POST', 'OPTIONS'],
+                allow_headers=['Content-Type'],
+            ),
+            Middleware(GZipMiddleware, minimum_size=512),
+        ],
+    )
+
+class ReusePortHTTPServer(ThreadingHTTPServer):
+    """Threaded server that lets several worker processes bind the same port"""
+
+    def server_bind(self):
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
 class MyHTTPRequestHandler(SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=SERVE_DIR, **kwargs)
-    
+
+    def guess_type(self, path):
+        return _guess_type(path)
+
     def end_headers(self):
         # Add CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -19,14 +63,26 @@ class MyHTTPRequestHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
-if __name__ == '__main__':
+@lru_cache(maxsize=512)
+def _guess_type(path):
+    # guess_type only reads the class-level extensions_map, so results are per path
+    return SimpleHTTPRequestHandler.guess_type(MyHTTPRequestHandler, path)
+
+def run_stdlib_server():
     os.chdir(SERVE_DIR)
-    server = HTTPServer(('0.0.0.0', PORT), MyHTTPRequestHandler)
-    print(f"✅ Frontend Server running on http://localhost:{PORT}")
-    print(f"   Serving from: {SERVE_DIR}")
-    print("   Press Ctrl+C to stop")
+    server = ReusePortHTTPServer(('0.0.0.0', PORT), MyHTTPRequestHandler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n✋ Server stopped")
         server.server_close()
+
+if __name__ == '__main__':
+    print(f"✅ Frontend Server running on http://localhost:{PORT}")
+    print(f"   Serving from: {SERVE_DIR}")
+    print("   Press Ctrl+C to stop")
+    if ASGI_AVAILABLE:
+        uvicorn.run(create_app(), host='0.0.0.0', port=PORT, loop='auto', http='auto', log_level='warning')
+    else:
+        print("   (uvicorn/starlette not installed - using stdlib server)", file=sys.stderr)
+        run_stdlib_server()
@@ -14,13 +14,58 @@ Validates ONLY the 6 mandatory fields as per Legal Metrology (Packaged Commoditi
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Tuple, Optional
 import re
 
 
-@dataclass
+# Patterns used by the rules, compiled once at import
+_QTY_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([a-zA-Z]+)")
+_MRP_RE = re.compile(r"(?:₹|rs\.?\s*)?(\d+(?:\.\d{1,2})?)", re.IGNORECASE)
+
+# Category keywords (substring match on the lowercased category)
+_TIME_SENSITIVE_RE = re.compile(r"food|beverage|snack|cosmetic|medicine|drug")
+_UNIT_PRICE_RE = re.compile(r"food|beverage|grocery|snack")
+
+# Valid units: g, kg, ml, l, cm, m, units, pieces
+_VALID_UNITS = frozenset({
+    "g", "kg", "ml", "l", "liter", "litre", "cm", "m", "unit", "units", "pc", "pcs", "piece", "pieces",
+})
+
+# Every field the rules read; validate() results are memoized on these values
+RULE_INPUT_FIELDS = (
+    "manufacturer_details",
+    "importer_details",
+    "country_of_origin",
+    "generic_name",
+    "net_quantity",
+    "mrp",
+    "best_before_date",
+    "expiry_date",
+    "category",
+    "date_of_manufacture",
+    "date_of_import",
+    "unit_sale_price",
+)
+VALIDATE_CACHE_SIZE = 1024
+BATCH_CHUNK_SIZE = 64
+
+
+# ---------- helpers to get values safely ----------
+
+def _get(d: Dict[str, Any], key: str) -> Optional[str]:
+    v = d.get(key)
+    return v.strip() if isinstance(v, str) else v
+
+
+def _is_none_or_empty(value: Any) -> bool:
+    """Expects a value from _get, whose strings are already stripped"""
+    return value is None or value == ""
+
+
+@dataclass(slots=True, frozen=True)
 class Rule:
     rule_id: str
     description: str
@@ -28,40 +73,51 @@ class Rule:
     severity: str  # "critical" | "high" | "medium" | "low"
     func: Callable[[Dict[str, Any]], Tuple[bool, str]]
     # func returns (violated: bool, details: str)
+    requires: Optional[str] = None
+    # rule_id of a presence rule; when that rule fires, this one is not applicable
+
+
+@dataclass(slots=True, frozen=True)
+class RuleResult:
+    rule_id: str
+    description: str
+    field: str
+    severity: str
+    violated: bool
+    details: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule_id": self.rule_id,
+            "description": self.description,
+            "field": self.field,
+            "severity": self.severity,
+            "violated": self.violated,
+            "details": self.details,
+        }
 
 
 class ComplianceValidator:
     def __init__(self) -> None:
         self.rules: List[Rule] = []
         self._build_rules()
-
-    # ---------- helpers to get values safely ----------
-
-    @staticmethod
-    def _get(d: Dict[str, Any], key: str) -> Optional[str]:
-        v = d.get(key)
-        if v is None:
-            return None
-        if isinstance(v, str):
-            v = v.strip()
-        return v
-
-    @staticmethod
-    def _is_none_or_empty(value: Any) -> bool:
-        if value is None:
-            return True
-        if isinstance(value, str) and value.strip() == "":
-            return True
-        return False
+        # Static part of each per-rule result; only violated/details vary per record
+        self._rule_meta = tuple(
+            (rule.rule_id, rule.description, rule.field, rule.severity) for rule in self.rules
+        )
+        # Flat (func, rule_id, requires) tuples so the hot loop does no attribute loads
+        self._rule_funcs = tuple((rule.func, rule.rule_id, rule.requires) for rule in self.rules)
+        # Per-instance LRU of RuleResult tuples keyed by the rule input values
+        self._validate_cached = lru_cache(maxsize=VALIDATE_CACHE_SIZE)(self._validate_key)
 
     # ---------- field specific validators ----------
 
     def _rule_manufacturer_or_importer_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 1: Name and address of manufacturer/importer"""
-        manu = self._get(data, "manufacturer_details")
-        impr = self._get(data, "importer_details")
+        manu = _get(data, "manufacturer_details")
+        impr = _get(data, "importer_details")
         
-        if self._is_none_or_empty(manu) and self._is_none_or_empty(impr):
+        if _is_none_or_empty(manu) and _is_none_or_empty(impr):
             return True, "Name and address of manufacturer/importer is mandatory but missing."
         
         # Check if details are sufficient (at least 10 characters)
@@ -73,26 +129,26 @@ class ComplianceValidator:
 
     def _rule_country_origin_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 2: Country of origin (if imported)"""
-        origin = self._get(data, "country_of_origin")
+        origin = _get(data, "country_of_origin")
         
         # Check if product is imported
-        importer = self._get(data, "importer_details")
-        is_imported = not self._is_none_or_empty(importer)
+        importer = _get(data, "importer_details")
+        is_imported = not _is_none_or_empty(importer)
         
-        if is_imported and self._is_none_or_empty(origin):
+        if is_imported and _is_none_or_empty(origin):
             return True, "Country of origin is mandatory for imported products but is missing."
         
         # If country is provided, validate it's reasonable
-        if not self._is_none_or_empty(origin) and len(origin) < 3:
+        if not _is_none_or_empty(origin) and len(origin) < 3:
             return True, f"Invalid country of origin: '{origin}'."
         
         return False, ""
 
     def _rule_generic_name_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 3: Common, generic name of the commodity"""
-        generic_name = self._get(data, "generic_name")
+        generic_name = _get(data, "generic_name")
         
-        if self._is_none_or_empty(generic_name):
+        if _is_none_or_empty(generic_name):
             return True, "Common/generic name of the commodity is mandatory but missing."
         
         if len(generic_name) < 2:
@@ -102,101 +158,88 @@ class ComplianceValidator:
 
     def _rule_net_qty_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 4: Net quantity in standard unit"""
-        qty = self._get(data, "net_quantity")
+        qty = _get(data, "net_quantity")
         
-        if self._is_none_or_empty(qty):
+        if _is_none_or_empty(qty):
             return True, "Net quantity is mandatory but missing."
         
         return False, ""
 
     def _rule_net_qty_unit(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 4 (validation): Net quantity must have valid unit"""
-        qty = self._get(data, "net_quantity")
+        qty = _get(data, "net_quantity")
         
-        if self._is_none_or_empty(qty):
+        if _is_none_or_empty(qty):
             return False, ""  # handled by missing rule
         
-        # Valid units: g, kg, ml, l, cm, m, units, pieces
-        valid_units = ["g", "kg", "ml", "l", "liter", "litre", "cm", "m", "unit", "units", "pc", "pcs", "piece", "pieces"]
-        
         # Parse number + unit
-        match = re.search(r"(\d+(\.\d+)?)\s*([a-zA-Z]+)", qty)
+        match = _QTY_RE.search(qty)
         if not match:
             return True, f"Could not parse quantity and unit from '{qty}'. Must include number and unit (e.g., '500g', '1L')."
         
-        unit = match.group(3).lower()
-        if unit not in valid_units:
+        unit = match.group(2).lower()
+        if unit not in _VALID_UNITS:
             return True, f"Unit '{unit}' is not a valid standard unit. Use: g, kg, ml, L, cm, m, units, pieces."
         
         return False, ""
 
     def _rule_mrp_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 5: MRP including all taxes"""
-        mrp = self._get(data, "mrp")
+        mrp = _get(data, "mrp")
         
-        if self._is_none_or_empty(mrp):
+        if _is_none_or_empty(mrp):
             return True, "MRP (Maximum Retail Price) including all taxes is mandatory but missing."
         
         return False, ""
 
     def _rule_mrp_format(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 5 (validation): MRP format validation"""
-        mrp = self._get(data, "mrp")
+        mrp = _get(data, "mrp")
         
-        if self._is_none_or_empty(mrp):
+        if _is_none_or_empty(mrp):
             return False, ""  # handled by missing rule
         
-        # Check for standard format (₹50.00, Rs 50, or plain number)
-        pattern = r"(₹|rs\.?\s*)?(\d+(\.\d{1,2})?)"
-        
-        if re.search(pattern, mrp, flags=re.IGNORECASE):
+        # Check for standard format (₹50.00, Rs 50, or plain number).
+        # The prefix is optional, so any digit run matches; a string with no
+        # digits can never parse as a positive number either, so one search decides
+        if _MRP_RE.search(mrp):
             return False, ""
         
-        # Try to extract just numbers
-        clean_mrp = re.sub(r"[^\d.]", "", mrp)
-        try:
-            val = float(clean_mrp)
-            if val > 0:
-                return False, ""
-        except ValueError:
-            pass
-        
         return True, f"MRP format invalid: '{mrp}'. Expected format: ₹XX.XX or Rs. XX"
 
     def _rule_best_before_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 6: Best before/use by date (for time-sensitive commodities)"""
-        best_before = self._get(data, "best_before_date")
-        expiry = self._get(data, "expiry_date")
+        best_before = _get(data, "best_before_date")
+        expiry = _get(data, "expiry_date")
         
-        # Check if this is a time-sensitive commodity
-        category = (self._get(data, "category") or "").lower()
-        is_time_sensitive = any(k in category for k in ["food", "beverage", "snack", "cosmetic", "medicine", "drug"])
+        category = (_get(data, "category") or "").lower()
         
-        if is_time_sensitive:
-            if self._is_none_or_empty(best_before) and self._is_none_or_empty(expiry):
+        # Cheap emptiness checks first; only then is the category keyword scan needed
+        if _is_none_or_empty(best_before) and _is_none_or_empty(expiry):
+            # Check if this is a time-sensitive commodity
+            if _TIME_SENSITIVE_RE.search(category):
                 return True, f"Best before/use by date is mandatory for '{category}' items but is missing."
         
         return False, ""
 
     def _rule_date_of_manufacture_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 7: Date of manufacture or import"""
-        mfg_date = self._get(data, "date_of_manufacture")
-        imp_date = self._get(data, "date_of_import")
+        mfg_date = _get(data, "date_of_manufacture")
+        imp_date = _get(data, "date_of_import")
         
-        if self._is_none_or_empty(mfg_date) and self._is_none_or_empty(imp_date):
+        if _is_none_or_empty(mfg_date) and _is_none_or_empty(imp_date):
             return True, "Date of manufacture or import is mandatory but missing."
         
         return False, ""
 
     def _rule_unit_sale_price_missing(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """Rule 8: Unit sale price (for packaged commodities)"""
-        unit_price = self._get(data, "unit_sale_price")
+        unit_price = _get(data, "unit_sale_price")
         
-        # Check if this requires unit sale price
-        category = (self._get(data, "category") or "").lower()
-        requires_unit_price = any(k in category for k in ["food", "beverage", "grocery", "snack"])
+        category = (_get(data, "category") or "").lower()
         
-        if requires_unit_price and self._is_none_or_empty(unit_price):
+        # Check if this requires unit sale price (cheap emptiness check first)
+        if _is_none_or_empty(unit_price) and _UNIT_PRICE_RE.search(category):
             return True, f"Unit sale price is mandatory for '{category}' items but is missing."
         
         return False, ""
@@ -250,6 +293,7 @@ class ComplianceValidator:
                 "net_quantity",
                 "high",
                 self._rule_net_qty_unit,
+                requires="LM_RULE_04_NET_QTY_MISSING",
             ),
             Rule(
                 "LM_RULE_05_MRP_MISSING",
@@ -264,6 +308,7 @@ class ComplianceValidator:
                 "mrp",
                 "high",
                 self._rule_mrp_format,
+                requires="LM_RULE_05_MRP_MISSING",
             ),
             Rule(
                 "LM_RULE_06_BEST_BEFORE",
@@ -294,38 +339,82 @@ class ComplianceValidator:
         """
         Run all rules on structured_data.
         Returns a dict with overall status and per-rule results.
-        """
-        rule_results: List[Dict[str, Any]] = []
-        violations_count = 0
 
-        for rule in self.rules:
-            violated, details = rule.func(structured_data)
-            if violated:
-                violations_count += 1
-
-            rule_results.append(
-                {
-                    "rule_id": rule.rule_id,
-                    "description": rule.description,
-                    "field": rule.field,
-                    "severity": rule.severity,
-                    "violated": bool(violated),
-                    "details": details or "",
-                }
-            )
+        Inputs whose rule fields are all strings or None (the usual OCR/LLM output)
+        are served from an LRU cache; callers always get their own copy.
+        """
+        key = tuple(structured_data.get(f) for f in RULE_INPUT_FIELDS)
+        if all(v is None or type(v) is str for v in key):
+            rule_results = self._validate_cached(key)
+        else:
+            rule_results = self._run_rules(structured_data)
 
+        violations_count = sum(r.violated for r in rule_results)
         overall_status = "VIOLATION" if violations_count > 0 else "COMPLIANT"
 
         return {
             "overall_status": overall_status,
             "total_rules": len(self.rules),
             "violations_count": violations_count,
-            "rule_results": rule_results,
+            "rule_results": [r.to_dict() for r in rule_results],
         }
 
+    def validate_batch(
+        self, records: List[Dict[str, Any]], max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Validate many records in one call.
+        Returns one validate() result per record, in order; duplicate records hit the cache.
+
+        Rules hold the GIL, so threads only pay off on free-threaded builds;
+        pass max_workers > 1 to spread BATCH_CHUNK_SIZE slices over a thread pool there.
+        """
+        validate = self.validate
+        if not max_workers or max_workers <= 1 or len(records) <= BATCH_CHUNK_SIZE:
+            return [validate(record) for record in records]
+
+        def validate_chunk(chunk):
+            return [validate(record) for record in chunk]
+
+        # Executor.map ignores chunksize for threads, so submit one slice per future
+        chunks = [records[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(records), BATCH_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return [result for chunk in pool.map(validate_chunk, chunks) for result in chunk]
+
+    def _validate_key(self, key: Tuple[Optional[str], ...]) -> Tuple[RuleResult, ...]:
+        return self._run_rules(dict(zip(RULE_INPUT_FIELDS, key)))
+
+    def _run_rules(self, structured_data: Dict[str, Any]) -> Tuple[RuleResult, ...]:
+        rule_results: List[RuleResult] = []
+        fired = set()
+
+        for (func, rule_id, requires), meta in zip(self._rule_funcs, self._rule_meta):
+            if requires in fired:
+                # Field already reported missing; skip re-reading and re-checking it
+                violated, details = False, ""
+            else:
+                violated, details = func(structured_data)
+            if violated:
+                fired.add(rule_id)
+
+            rule_results.append(RuleResult(*meta, bool(violated), details or ""))
+
+        return tuple(rule_results)
+
+
+# Shared instance so repeated callers benefit from the validate() cache
+_default_validator: Optional[ComplianceValidator] = None
+
+
+def get_default_validator() -> ComplianceValidator:
+    """Lazily build the process-wide validator once."""
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = ComplianceValidator()
+    return _default_validator
+
 
 # Helper function for backward compatibility
 def validate_compliance_score(data: Dict[str, Any]) -> Dict[str, Any]:
     """Validate compliance and return results"""
-    validator = ComplianceValidator()
-    return validator.validate(data)
+    return get_default_validator().validate(data)
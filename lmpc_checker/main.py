@@ -33,12 +33,16 @@ from __future__ import annotations
 import io
 import json
 import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from PIL import Image
 
-from .compliance_validator import ComplianceValidator
+from .compliance_validator import get_default_validator
 
 # Optional heavy deps – imported lazily
 __tokenizer = None
@@ -47,6 +51,17 @@ __model = None
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# orjson for the LLM output round trip when installed; stdlib json otherwise
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+
+def _json_loads(text: str) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
 # -------------------------------------------------------------------
 # YOLO SETUP
 # -------------------------------------------------------------------
@@ -74,13 +89,14 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_YOLO_PATH = PROJECT_ROOT / "runs" / "detect" / "train" / "weights" / "best.pt"
 
 _yolo_model: Optional[Any] = None
+_yolo_half = False  # FP16 inference, enabled only when the model sits on a CUDA device
 
 
 def get_yolo_model() -> Optional[Any]:
     """
     Lazy-load YOLO model once.
     """
-    global _yolo_model
+    global _yolo_model, _yolo_half
     if _yolo_model is not None:
         return _yolo_model
 
@@ -95,6 +111,13 @@ def get_yolo_model() -> Optional[Any]:
 
     logger.info(f"Loading YOLO model from: {model_path}")
     _yolo_model = YOLO(str(model_path))
+
+    try:
+        import torch
+
+        _yolo_half = torch.cuda.is_available()
+    except Exception:
+        _yolo_half = False
     return _yolo_model
 
 
@@ -103,46 +126,87 @@ def get_yolo_model() -> Optional[Any]:
 # -------------------------------------------------------------------
 
 
-def _ocr_with_surya(pil_image: Image.Image) -> Optional[str]:
-    """
-    Try OCR using Surya OCR.
-    If anything fails, return None so we can fall back to pytesseract.
-    """
-    try:
-        from surya.ocr import run_ocr
-        from surya.model.detection import model as det_model
-        from surya.model.recognition.model import load_model as load_rec_model
-        from surya.model.recognition.processor import (
-            load_processor as load_rec_processor,
-        )
+# Sentinel stored in _surya_models once a load has failed, so later calls skip Surya
+_SURYA_UNAVAILABLE = object()
 
-        logger.info("Running Surya OCR on crop...")
-        langs = ["en", "hi"]
+_surya_models: Any = None
+_surya_lock = threading.Lock()
 
-        det_processor = det_model.load_processor()
-        detection_model = det_model.load_model()
 
-        rec_model = load_rec_model()
-        rec_processor = load_rec_processor()
-
-        predictions = run_ocr(
-            [pil_image],
-            [langs],
-            detection_model,
-            det_processor,
-            rec_model,
-            rec_processor,
-        )
-
-        # predictions[0] is a list of dicts; each dict has "text"
-        if not predictions:
-            return None
+def get_surya_models() -> Tuple[Any, ...]:
+    """
+    Lazy-load Surya once: (run_ocr, detection_model, det_processor, rec_model, rec_processor).
+    Raises if Surya is not installed or fails to load; the failure is remembered so the
+    load is only attempted once. The lock keeps concurrent Streamlit sessions from
+    loading the weights twice.
+    """
+    global _surya_models
+    if _surya_models is None:
+        with _surya_lock:
+            if _surya_models is None:
+                try:
+                    from surya.ocr import run_ocr
+                    from surya.model.detection import model as det_model
+                    from surya.model.recognition.model import load_model as load_rec_model
+                    from surya.model.recognition.processor import (
+                        load_processor as load_rec_processor,
+                    )
+
+                    logger.info("Loading Surya OCR models...")
+                    _surya_models = (
+                        run_ocr,
+                        det_model.load_model(),
+                        det_model.load_processor(),
+                        load_rec_model(),
+                        load_rec_processor(),
+                    )
+                except Exception as e:
+                    logger.warning(f"Surya OCR unavailable; using pytesseract from now on. Error: {e}")
+                    _surya_models = _SURYA_UNAVAILABLE
+
+    if _surya_models is _SURYA_UNAVAILABLE:
+        raise RuntimeError("Surya OCR is unavailable")
+    return _surya_models
+
+
+def _batch_surya_ocr(images: List[Image.Image]) -> List[Optional[str]]:
+    """
+    Run Surya OCR on several images in one batched call.
+    Returns one text (or None) per image, in order. Raises if Surya fails.
+    """
+    run_ocr, detection_model, det_processor, rec_model, rec_processor = get_surya_models()
+
+    logger.info(f"Running Surya OCR on {len(images)} crop(s)...")
+    langs = ["en", "hi"]
+
+    predictions = run_ocr(
+        images,
+        [langs] * len(images),
+        detection_model,
+        det_processor,
+        rec_model,
+        rec_processor,
+    )
 
-        page_preds = predictions[0]
+    # predictions[i] is a list of dicts for images[i]; each dict has "text"
+    texts: List[Optional[str]] = []
+    for page_preds in predictions or []:
         lines = [p.get("text", "") for p in page_preds if p.get("text")]
         text = "\n".join(lines)
-        return text.strip() or None
+        texts.append(text.strip() or None)
+    texts.extend([None] * (len(images) - len(texts)))
+    return texts
+
 
+def _ocr_with_surya(pil_image: Image.Image) -> Optional[str]:
+    """
+    Try OCR using Surya OCR.
+    If anything fails, return None so we can fall back to pytesseract.
+    """
+    if _surya_models is _SURYA_UNAVAILABLE:
+        return None
+    try:
+        return _batch_surya_ocr([pil_image])[0]
     except Exception as e:
         logger.warning(f"Surya OCR failed or not available, falling back. Error: {e}")
         return None
@@ -203,15 +267,16 @@ def detect_panels(pil_image: Image.Image) -> Dict[int, List[Tuple[float, float,
         logger.warning("YOLO model not available; skipping panel detection.")
         return {}
 
-    results = model(pil_image, verbose=False)
+    results = model(pil_image, verbose=False, half=_yolo_half)
     boxes_per_class: Dict[int, List[Tuple[float, float, float, float]]] = {}
 
     for r in results:
         if r.boxes is None:
             continue
-        for b in r.boxes:
-            cls_id = int(b.cls.item())
-            x1, y1, x2, y2 = b.xyxy[0].tolist()
+        # One device->host copy per tensor instead of two .item()/.tolist() hops per box
+        cls_ids = r.boxes.cls.int().tolist()
+        xyxy = r.boxes.xyxy.tolist()
+        for cls_id, (x1, y1, x2, y2) in zip(cls_ids, xyxy):
             boxes_per_class.setdefault(cls_id, []).append((x1, y1, x2, y2))
 
     return boxes_per_class
@@ -233,11 +298,13 @@ def extract_panel_texts(
 
     w, h = pil_image.size
 
+    # Collect every crop first so Surya can OCR them in a single batch
+    crops: List[Image.Image] = []
+    owners: List[str] = []
     for cls_id, boxes in boxes_per_class.items():
         if cls_id < 0 or cls_id >= len(CLASSES):
             continue
         class_name = CLASSES[cls_id]
-        texts: List[str] = []
 
         for (x1, y1, x2, y2) in boxes:
             # clamp
@@ -246,13 +313,38 @@ def extract_panel_texts(
             x2c = max(0, min(w, x2))
             y2c = max(0, min(h, y2))
 
-            crop = pil_image.crop((x1c, y1c, x2c, y2c))
-            t = run_ocr_on_panel(crop)
-            if t:
-                texts.append(t)
+            crops.append(pil_image.crop((x1c, y1c, x2c, y2c)))
+            owners.append(class_name)
+
+    if not crops:
+        return panel_texts
 
-        if texts:
-            panel_texts[class_name] = "\n".join(texts)
+    texts: Optional[List[str]] = None
+    if _surya_models is not _SURYA_UNAVAILABLE:
+        try:
+            surya_texts = _batch_surya_ocr(crops)
+            texts = [t or _ocr_with_tesseract(crop) for t, crop in zip(surya_texts, crops)]
+        except Exception as e:
+            # A failed load is logged once by get_surya_models and handled below
+            if _surya_models is not _SURYA_UNAVAILABLE:
+                logger.warning(f"Batched Surya OCR failed, running panels one by one. Error: {e}")
+                # Models are loaded but the batch failed; retry per crop, keeping GPU calls serial
+                texts = [run_ocr_on_panel(crop) for crop in crops]
+
+    if texts is None:
+        # Surya could not be loaded, so go straight to tesseract: each call is a
+        # subprocess, so panels can run concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(crops), os.cpu_count() or 1)) as pool:
+            texts = list(pool.map(_ocr_with_tesseract, crops))
+
+    # Group texts back by panel class, keeping box order within a class
+    grouped: Dict[str, List[str]] = {}
+    for class_name, t in zip(owners, texts):
+        if t:
+            grouped.setdefault(class_name, []).append(t)
+
+    for class_name, class_texts in grouped.items():
+        panel_texts[class_name] = "\n".join(class_texts)
 
     return panel_texts
 
@@ -273,6 +365,7 @@ def _load_():
         return __tokenizer, __model
 
     from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+    import importlib.util
     import torch
 
     model_name = "google/-2-9b-it"
@@ -284,37 +377,187 @@ def _load_():
         bnb_4bit_compute_dtype=torch.float16,
     )
 
+    # FlashAttention-2 only when the kernel package is installed and a GPU is present
+    extra_kwargs = {}
+    if torch.cuda.is_available() and importlib.util.find_spec("flash_attn") is not None:
+        extra_kwargs["attn_implementation"] = "flash_attention_2"
+
     __tokenizer = AutoTokenizer.from_pretrained(model_name)
     __model = AutoModelForCausalLM.from_pretrained(
         model_name,
         quantization_config=bnb_config,
-        device_map="auto"
+        torch_dtype=torch.float16,
+        device_map="auto",
+        **extra_kwargs,
     )
     return __tokenizer, __model
 
 
+# Keys of the structured output (besides "raw_ocr")
+_STRUCTURED_KEYS = (
+    "mrp", "net_quantity", "country_of_origin", "manufacturer_details",
+    "importer_details", "date_of_manufacture", "date_of_import",
+    "best_before_date", "expiry_date", "customer_care_details",
+    "category", "unit_sale_price",
+)
+
+
+def _empty_structure(raw_ocr: str) -> Dict[str, Any]:
+    """Structured output with every field set to None"""
+    return {"raw_ocr": raw_ocr, **dict.fromkeys(_STRUCTURED_KEYS)}
+
+
+# The key list in the LLM prompt, one "- key: string or null" line per structured key
+_PROMPT_KEY_LINES = "\n".join(f'- "{key}": string or null' for key in _STRUCTURED_KEYS)
+
+
+# Fields the compliance rules read, as groups of alternatives (one per group must be set).
+# The LLM is skipped only when the regex extraction fills every group.
+_VALIDATOR_FIELD_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("mrp",),
+    ("net_quantity",),
+    ("manufacturer_details", "importer_details"),
+    ("date_of_manufacture", "date_of_import"),
+    ("best_before_date", "expiry_date"),
+    ("category",),
+    ("unit_sale_price",),
+)
+
+
+# Deterministic per-panel extractors, run before the LLM
+_PANEL_MRP_RE = re.compile(
+    r"(?:₹|\brs\.?|\binr\b|\bmrp\b\s*[:.\-]?)\s*(?:₹|rs\.?)?\s*\d+(?:\.\d{1,2})?", re.IGNORECASE
+)
+_PANEL_UNIT_PRICE_RE = re.compile(
+    r"(?:₹|rs\.?)?\s*\d+(?:\.\d+)?\s*(?:/|per)\s*(?:\d+\s*)?(?:kg|g|ml|l|unit|pc|piece)\b", re.IGNORECASE
+)
+_PANEL_QTY_RE = re.compile(
+    r"\b\d+(?:\.\d+)?\s*(?:kg|g|ml|l|litre|liter|cm|m|pcs|pc|pieces|piece|units|unit)\b", re.IGNORECASE
+)
+_PANEL_DATE_RE = re.compile(
+    r"\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b"
+    r"|\b\d{1,2}[/.-]\d{4}\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?[\s/-]*\d{2,4}\b",
+    re.IGNORECASE,
+)
+_PANEL_ORIGIN_RE = re.compile(
+    r"(?:country\s+of\s+origin|made\s+in|product\s+of)\s*[:\-]?\s*([A-Za-z][A-Za-z ]{2,})", re.IGNORECASE
+)
+_PANEL_IMPORT_RE = re.compile(r"\bimport", re.IGNORECASE)
+_PANEL_CARE_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d\s-]{7,}\d")
+# Same keywords the compliance rules look for in the category
+_PANEL_CATEGORY_RE = re.compile(r"food|beverage|grocery|snack|cosmetic|medicine|drug", re.IGNORECASE)
+
+
+def _extract_fields_heuristic(panel_texts: Dict[str, str]) -> Dict[str, str]:
+    """
+    Pull fields straight out of tagged panels with regexes.
+    Returns only the fields that were found.
+    """
+    fields: Dict[str, str] = {}
+
+    for panel, text in panel_texts.items():
+        if not text:
+            continue
+
+        if panel == "mrp_panel":
+            m = _PANEL_MRP_RE.search(text)
+            if m:
+                fields["mrp"] = m.group(0).strip()
+            m = _PANEL_UNIT_PRICE_RE.search(text)
+            if m:
+                fields["unit_sale_price"] = m.group(0).strip()
+        elif panel == "net_quantity_panel":
+            m = _PANEL_QTY_RE.search(text)
+            if m:
+                fields["net_quantity"] = m.group(0)
+        elif panel == "mfg_or_packed_date_panel":
+            m = _PANEL_DATE_RE.search(text)
+            if m:
+                fields["date_of_manufacture"] = m.group(0)
+        elif panel == "best_before_or_expiry_panel":
+            m = _PANEL_DATE_RE.search(text)
+            if m:
+                key = "expiry_date" if "exp" in text.lower() else "best_before_date"
+                fields[key] = m.group(0)
+        elif panel == "country_of_origin_panel":
+            m = _PANEL_ORIGIN_RE.search(text)
+            if m:
+                fields["country_of_origin"] = m.group(1).strip()
+        elif panel == "manufacturer_importer_panel":
+            details = text.strip()
+            if len(details) >= 10:
+                key = "importer_details" if _PANEL_IMPORT_RE.search(details) else "manufacturer_details"
+                fields[key] = details
+        elif panel == "customer_care_panel":
+            if _PANEL_CARE_RE.search(text):
+                fields["customer_care_details"] = text.strip()
+        elif panel == "brand_product_panel":
+            m = _PANEL_CATEGORY_RE.search(text)
+            if m:
+                fields["category"] = m.group(0).lower()
+
+    return fields
+
+
+def _heuristic_is_complete(fields: Dict[str, str]) -> bool:
+    """True when the regex output covers every field the compliance rules read."""
+    groups = _VALIDATOR_FIELD_GROUPS
+    if fields.get("importer_details"):
+        # Imported goods also need a country of origin
+        groups = groups + (("country_of_origin",),)
+    return all(any(fields.get(f) for f in group) for group in groups)
+
+
 def structure_ocr_from_panels(panel_texts: Dict[str, str]) -> Dict[str, Any]:
     """
-    Use  2 to convert tagged per-panel OCR into structured fields.
+    Convert tagged per-panel OCR into structured fields.
+    Regex extraction runs first;  2 only runs if a field the compliance rules
+    need is still missing, and its answers take precedence over the regex ones.
     """
     # if we have no panel texts, return empty structure
     if not panel_texts:
-        return {
-            "raw_ocr": "",
-            "mrp": None,
-            "net_quantity": None,
-            "country_of_origin": None,
-            "manufacturer_details": None,
-            "importer_details": None,
-            "date_of_manufacture": None,
-            "date_of_import": None,
-            "best_before_date": None,
-            "expiry_date": None,
-            "customer_care_details": None,
-            "category": None,
-            "unit_sale_price": None,
-        }
+        return _empty_structure("")
+
+    heuristic = _extract_fields_heuristic(panel_texts)
 
+    if not _heuristic_is_complete(heuristic):
+        # The LLM still sees every panel (fields like unit_sale_price can sit on any of them)
+        data = _structure_with_llm(panel_texts)
+        for key, value in heuristic.items():
+            if data.get(key) is None:
+                data[key] = value
+        return data
+
+    logger.info("All required fields resolved by regex extraction; skipping LLM.")
+    data = _empty_structure("\n\n".join(f"[{k.upper()}]\n{v}" for k, v in panel_texts.items()))
+    data.update(heuristic)
+    return data
+
+
+def _json_stop_criteria(tokenizer: Any, prompt_len: int) -> Any:
+    """
+    Stop generation once the model has emitted a complete top-level JSON object,
+    instead of always running to max_new_tokens.
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class JSONBraceStop(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            # Only re-check the whole output when the newest token closes a brace
+            if "}" not in tokenizer.decode(input_ids[0, -1:], skip_special_tokens=True):
+                return False
+            text = tokenizer.decode(input_ids[0, prompt_len:], skip_special_tokens=True)
+            opened = text.count("{")
+            return opened > 0 and opened == text.count("}")
+
+    return StoppingCriteriaList([JSONBraceStop()])
+
+
+def _structure_with_llm(panel_texts: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Use  2 to convert tagged per-panel OCR into structured fields.
+    """
     tokenizer, model = _load_()
 
     # Build a prompt with explicit tags to help the model
@@ -333,18 +576,7 @@ Each panel is tagged (e.g., [MRP_PANEL], [NET_QUANTITY_PANEL]).
 
 Your task is to extract key Legal Metrology fields and return ONLY valid JSON
 with these exact keys:
-- "mrp": string or null
-- "net_quantity": string or null
-- "country_of_origin": string or null
-- "manufacturer_details": string or null
-- "importer_details": string or null
-- "date_of_manufacture": string or null
-- "date_of_import": string or null
-- "best_before_date": string or null
-- "expiry_date": string or null
-- "customer_care_details": string or null
-- "category": string or null
-- "unit_sale_price": string or null
+{_PROMPT_KEY_LINES}
 - "raw_ocr": (put the input text here)
 
 If a field is not present, set it to null.
@@ -367,7 +599,8 @@ PANEL_OCR_TEXT:
         **inputs,
         max_new_tokens=1024, # Increased for larger JSON
         do_sample=False,
-        temperature=0.0
+        temperature=0.0,
+        stopping_criteria=_json_stop_criteria(tokenizer, inputs["input_ids"].shape[1]),
     )
     
     decoded = tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
@@ -379,16 +612,10 @@ PANEL_OCR_TEXT:
         end = decoded.rfind("}")
         if start != -1 and end != -1 and end > start:
             decoded = decoded[start : end + 1]
-        data = json.loads(decoded)
+        data = _json_loads(decoded)
         if isinstance(data, dict):
             # Ensure at least the expected keys exist and normalize
-            expected_keys = [
-                "mrp", "net_quantity", "country_of_origin", "manufacturer_details",
-                "importer_details", "date_of_manufacture", "date_of_import",
-                "best_before_date", "expiry_date", "customer_care_details",
-                "category", "unit_sale_price"
-            ]
-            for key in expected_keys:
+            for key in _STRUCTURED_KEYS:
                 data.setdefault(key, None)
             
             # Ensure raw_ocr is preserved if model missed it
@@ -400,21 +627,7 @@ PANEL_OCR_TEXT:
         logger.warning(f"Failed to parse  output as JSON: {e}. Output was: {decoded!r}")
 
     # Fallback: just return raw text in minimal structure
-    return {
-        "raw_ocr": tagged_text,
-        "mrp": None,
-        "net_quantity": None,
-        "country_of_origin": None,
-        "manufacturer_details": None,
-        "importer_details": None,
-        "date_of_manufacture": None,
-        "date_of_import": None,
-        "best_before_date": None,
-        "expiry_date": None,
-        "customer_care_details": None,
-        "category": None,
-        "unit_sale_price": None,
-    }
+    return _empty_structure(tagged_text)
 
 
 # -------------------------------------------------------------------
@@ -436,8 +649,11 @@ def run_pipeline_for_image(image_bytes: bytes) -> Dict[str, Any]:
             - "raw_ocr_text": combined OCR text (tagged panels)
             - "panel_texts": per-panel OCR
     """
-    # 1. Load image
-    pil_image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    # 1. Load image. For large JPEGs, let libjpeg decode at a reduced DCT scale
+    # that still keeps both sides >= 1280px (no-op for other formats)
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("RGB", (1280, 1280))
+    pil_image = img.convert("RGB")
 
     # 2. YOLO panel detection
     boxes_per_class = detect_panels(pil_image)
@@ -453,9 +669,8 @@ def run_pipeline_for_image(image_bytes: bytes) -> Dict[str, Any]:
     # 4. Structure text with  2
     structured_data = structure_ocr_from_panels(panel_texts)
 
-    # 5. Validate with rule engine
-    validator = ComplianceValidator()
-    compliance_summary = validator.validate(structured_data)
+    # 5. Validate with rule engine (shared validator; rules are built once per process)
+    compliance_summary = get_default_validator().validate(structured_data)
 
     # Build raw_ocr_text as combined panel text (for debugging/UI)
     combined_ocr = "\n\n".join(
@@ -484,4 +699,7 @@ if __name__ == "__main__":
     else:
         with img_path.open("rb") as f:
             out = run_pipeline_for_image(f.read())
-        print(json.dumps(out, indent=2, ensure_ascii=False))
+        if orjson is not None:
+            print(orjson.dumps(out, option=orjson.OPT_INDENT_2).decode())
+        else:
+            print(json.dumps(out, indent=2, ensure_ascii=False))
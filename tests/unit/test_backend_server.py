@@ -0,0 +1,280 @@
+"""
+Unit tests for the backend server's response caches
+"""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import backend_server  # noqa: E402
+from werkzeug.datastructures import FileStorage  # noqa: E402
+
+SPOOL_MAX_SIZE = 500 * 1024  # Werkzeug's default_stream_factory threshold
+
+
+@pytest.fixture
+def client():
+    """Test client that rolls MOCK_PRODUCTS back after each test"""
+    products = list(backend_server.MOCK_PRODUCTS)
+    yield backend_server.app.test_client()
+    backend_server.MOCK_PRODUCTS[:] = products
+    backend_server._PRODUCTS_BY_ID.clear()
+    backend_server._PRODUCTS_BY_ID.update({p['id']: p for p in products})
+    backend_server._set_cached('products', backend_server.MOCK_PRODUCTS)
+    backend_server._products_version += 1
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Point upload saves at a temporary directory"""
+    monkeypatch.setattr(backend_server, '_UPLOAD_DIR', tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def sendfile_calls(monkeypatch):
+    """Record os.sendfile calls made while saving uploads"""
+    calls = []
+    real_sendfile = os.sendfile
+
+    def sendfile(out_fd, in_fd, offset, count):
+        calls.append(count)
+        return real_sendfile(out_fd, in_fd, offset, count)
+
+    monkeypatch.setattr(os, 'sendfile', sendfile)
+    return calls
+
+
+def _spooled_upload(data, filename='label.jpg'):
+    stream = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='rb+')
+    stream.write(data)
+    stream.seek(0)
+    return FileStorage(stream=stream, filename=filename)
+
+
+def _add_product(client, name='Zyxel Test Oats'):
+    response = client.post('/api/products', json={'name': name, 'brand': 'Testco', 'category': 'Food'})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+class TestSearch:
+    """Test suite for the precomputed search haystacks"""
+
+    def test_matches_name_and_brand(self, client):
+        name = backend_server.MOCK_PRODUCTS[0]['name']
+        brand = backend_server.MOCK_PRODUCTS[0]['brand']
+
+        assert backend_server.MOCK_PRODUCTS[0] in client.get(f'/api/search?q={name.upper()}').get_json()
+        assert backend_server.MOCK_PRODUCTS[0] in client.get(f'/api/search?q={brand.lower()}').get_json()
+
+    def test_empty_query(self, client):
+        assert client.get('/api/search?q=').get_json() == []
+
+    def test_search_reflects_new_product(self, client):
+        assert client.get('/api/search?q=zyxel').get_json() == []
+
+        new_product = _add_product(client)
+
+        assert client.get('/api/search?q=ZYXEL').get_json() == [new_product]
+
+
+class TestExportCache:
+    """Test suite for the cached export payloads"""
+
+    @pytest.mark.parametrize('format_type', ['csv', 'json'])
+    def test_export_reflects_new_product(self, client, format_type):
+        before = client.get(f'/api/export?format={format_type}').data
+        assert b'Zyxel Test Oats' not in before
+
+        _add_product(client)
+
+        after = client.get(f'/api/export?format={format_type}').data
+        assert b'Zyxel Test Oats' in after
+        assert after.startswith(before[:20])
+
+    def test_export_is_reused_when_unchanged(self, client):
+        client.get('/api/export?format=csv')
+        cached = backend_server._EXPORT_CACHE['csv']
+
+        client.get('/api/export?format=csv')
+        assert backend_server._EXPORT_CACHE['csv'] is cached
+
+    def test_csv_header_and_rows(self, client):
+        response = client.get('/api/export?format=csv')
+        lines = response.data.decode('utf-8').splitlines()
+
+        assert response.mimetype == 'text/csv'
+        assert lines[0] == 'Product Name,Brand,Category,Compliant'
+        assert len(lines) == len(backend_server.MOCK_PRODUCTS) + 1
+
+    def test_invalid_export_format(self, client):
+        assert client.get('/api/export?format=xml').status_code == 400
+
+
+class TestConditionalGet:
+    """Test suite for ETag/304 handling of cached payloads"""
+
+    def test_etag_and_not_modified(self, client):
+        response = client.get('/api/products')
+        etag = response.headers['ETag']
+
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+        response = client.get('/api/products', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_stale_etag_gets_full_response(self, client):
+        response = client.get('/api/products', headers={'If-None-Match': '"stale"'})
+        assert response.status_code == 200
+        assert response.get_json()
+
+    def test_create_product_changes_etag(self, client):
+        etag = client.get('/api/products').headers['ETag']
+        new_product = _add_product(client)
+
+        response = client.get('/api/products', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert new_product in response.get_json()
+
+    def test_static_payload_max_age(self, client):
+        response = client.get('/api/analytics/compliance-trend')
+        assert response.headers['Cache-Control'] == 'public, max-age=60'
+
+
+class TestFastSave:
+    """Test suite for the sendfile upload path"""
+
+    def test_small_upload_stays_in_memory(self, upload_dir, sendfile_calls):
+        data = b'x' * 1024
+        upload = _spooled_upload(data)
+
+        backend_server._fast_save(upload, upload_dir / 'label.jpg')
+
+        assert not upload.stream._rolled
+        assert sendfile_calls == []
+        assert (upload_dir / 'label.jpg').read_bytes() == data
+
+    def test_large_upload_uses_sendfile(self, upload_dir, sendfile_calls):
+        data = os.urandom(SPOOL_MAX_SIZE + 1)
+        upload = _spooled_upload(data)
+        assert upload.stream._rolled
+
+        backend_server._fast_save(upload, upload_dir / 'label.jpg')
+
+        assert sendfile_calls
+        assert (upload_dir / 'label.jpg').read_bytes() == data
+
+    def test_in_memory_stream(self, upload_dir, sendfile_calls):
+        upload = FileStorage(stream=io.BytesIO(b'jpeg bytes'), filename='label.jpg')
+
+        backend_server._fast_save(upload, upload_dir / 'label.jpg')
+
+        assert sendfile_calls == []
+        assert (upload_dir / 'label.jpg').read_bytes() == b'jpeg bytes'
+
+    def test_validate_endpoint_does_not_roll_small_uploads(self, client, upload_dir, monkeypatch):
+        rolled = []
+        fast_save = backend_server._fast_save
+
+        def recording_fast_save(file, filepath):
+            fast_save(file, filepath)
+            rolled.append(file.stream._rolled)
+
+        monkeypatch.setattr(backend_server, '_fast_save', recording_fast_save)
+        response = client.post(
+            '/api/validate',
+            data={'image': (io.BytesIO(b'x' * 1024), 'label.jpg')},
+            content_type='multipart/form-data',
+        )
+
+        assert response.status_code == 200
+        assert rolled == [False]
+        assert (upload_dir / 'label.jpg').read_bytes() == b'x' * 1024
+
+
+class TestUploadSaves:
+    """Test suite for atomic and batched upload writes"""
+
+    def test_saved_file_is_world_readable(self, upload_dir):
+        backend_server._fast_save(_spooled_upload(b'data'), upload_dir / 'label.jpg')
+
+        assert os.stat(upload_dir / 'label.jpg').st_mode & 0o777 == 0o644
+        assert [p.name for p in upload_dir.iterdir()] == ['label.jpg']
+
+    def test_failed_save_leaves_no_temp_file(self, upload_dir):
+        class BrokenStream(io.BytesIO):
+            def read(self, *args):
+                raise OSError('client went away')
+
+        upload = FileStorage(stream=BrokenStream(), filename='label.jpg')
+        with pytest.raises(OSError):
+            backend_server._fast_save(upload, upload_dir / 'label.jpg')
+
+        assert list(upload_dir.iterdir()) == []
+
+    def test_save_replaces_existing_file(self, upload_dir):
+        (upload_dir / 'label.jpg').write_bytes(b'old')
+
+        backend_server._fast_save(_spooled_upload(b'new'), upload_dir / 'label.jpg')
+
+        assert (upload_dir / 'label.jpg').read_bytes() == b'new'
+
+    def test_save_uploads_writes_every_file(self, upload_dir):
+        uploads = [(_spooled_upload(b'%d' % i), upload_dir / f'{i}.jpg') for i in range(20)]
+
+        backend_server._save_uploads(uploads)
+
+        for i in range(20):
+            assert (upload_dir / f'{i}.jpg').read_bytes() == b'%d' % i
+
+    def test_save_uploads_keeps_last_duplicate(self, upload_dir):
+        target = upload_dir / 'label.jpg'
+
+        backend_server._save_uploads([(_spooled_upload(b'first'), target), (_spooled_upload(b'last'), target)])
+
+        assert target.read_bytes() == b'last'
+        assert list(upload_dir.iterdir()) == [target]
+
+    def test_batch_process_endpoint(self, client, upload_dir):
+        response = client.post(
+            '/api/batch-process',
+            data={'images': [(io.BytesIO(b'a'), 'a.jpg'), (io.BytesIO(b'b'), 'b.jpg')]},
+            content_type='multipart/form-data',
+        )
+
+        assert response.status_code == 200
+        assert (upload_dir / 'a.jpg').read_bytes() == b'a'
+        assert (upload_dir / 'b.jpg').read_bytes() == b'b'
+
+
+class TestGeventStartup:
+    """Test suite for the BHARATVISION_GEVENT switch"""
+
+    def test_missing_gevent_fails_with_install_hint(self):
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            pytest.skip('gevent is installed')
+
+        env = dict(os.environ, BHARATVISION_GEVENT='1')
+        result = subprocess.run(
+            [sys.executable, '-c', 'import backend_server'],
+            cwd=Path(backend_server.__file__).parent, env=env, capture_output=True, text=True,
+        )
+
+        assert result.returncode != 0
+        assert 'pip install gunicorn gevent' in result.stderr
@@ -9,7 +9,7 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lmpc_checker"))
 
-from compliance_validator import validate_compliance_score
+from compliance_validator import BATCH_CHUNK_SIZE, ComplianceValidator, validate_compliance_score
 
 
 class TestComplianceValidator:
@@ -92,5 +92,84 @@ class TestMandatoryFields:
         pass
 
 
+SAMPLE_RECORDS = [
+    {'mrp': 'Rs. 100', 'net_quantity': '500g', 'manufacturer_details': 'ABC Foods Pvt Ltd, Mumbai',
+     'date_of_manufacture': '01/2024', 'best_before_date': '01/2025', 'category': 'snack',
+     'unit_sale_price': 'Rs. 0.20/g'},
+    {'net_quantity': '1 L', 'importer_details': 'XYZ Traders, Delhi'},
+    {},
+    {'mrp': 'Rs 5', 'manufacturer_details': {'name': 'ABC Foods'}, 'net_quantity': None},
+]
+
+
+class TestValidateCache:
+    """Test suite for the validate() LRU cache"""
+
+    def test_repeated_input_hits_cache(self):
+        validator = ComplianceValidator()
+        results = [validator.validate(dict(SAMPLE_RECORDS[0])) for _ in range(5)]
+        info = validator._validate_cached.cache_info()
+
+        assert info.misses == 1
+        assert info.hits == 4
+        assert all(r == results[0] for r in results)
+
+    def test_non_string_values_bypass_cache(self):
+        validator = ComplianceValidator()
+        validator.validate(SAMPLE_RECORDS[3])
+        assert validator._validate_cached.cache_info().currsize == 0
+
+    def test_cached_results_are_independent_copies(self):
+        validator = ComplianceValidator()
+        first = validator.validate(SAMPLE_RECORDS[1])
+        first['rule_results'][0]['violated'] = 'mutated'
+        first['rule_results'].clear()
+
+        second = validator.validate(SAMPLE_RECORDS[1])
+        assert second['rule_results']
+        assert second['rule_results'][0]['violated'] in (True, False)
+
+
+class TestValidateBatch:
+    """Test suite for batch validation"""
+
+    def test_batch_matches_single_validation(self):
+        validator = ComplianceValidator()
+        expected = [validator.validate(r) for r in SAMPLE_RECORDS]
+        assert validator.validate_batch(SAMPLE_RECORDS) == expected
+
+    def test_empty_batch(self):
+        assert ComplianceValidator().validate_batch([]) == []
+
+    def test_duplicate_records_hit_cache(self):
+        validator = ComplianceValidator()
+        validator.validate_batch([SAMPLE_RECORDS[0]] * 5)
+        info = validator._validate_cached.cache_info()
+        assert info.misses == 1
+        assert info.hits == 4
+
+    def test_thread_pool_keeps_order(self):
+        validator = ComplianceValidator()
+        records = SAMPLE_RECORDS * BATCH_CHUNK_SIZE + SAMPLE_RECORDS[:1]
+        expected = [validator.validate(r) for r in records]
+        assert validator.validate_batch(records, max_workers=4) == expected
+
+    def test_thread_pool_submits_one_future_per_chunk(self, monkeypatch):
+        import compliance_validator
+
+        submitted = []
+
+        class RecordingPool(compliance_validator.ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(args)
+                return super().submit(fn, *args, **kwargs)
+
+        monkeypatch.setattr(compliance_validator, "ThreadPoolExecutor", RecordingPool)
+        records = SAMPLE_RECORDS * BATCH_CHUNK_SIZE + SAMPLE_RECORDS[:1]
+        ComplianceValidator().validate_batch(records, max_workers=2)
+
+        assert [len(args[0]) for args in submitted] == [BATCH_CHUNK_SIZE] * 4 + [1]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+"""
+Unit tests for the project archive writer
+"""
+
+import io
+import zipfile
+import zlib
+
+import generate_project
+
+
+def _archive_bytes(entries, comment=b""):
+    buf = io.BytesIO()
+    deflated = map(generate_project._deflate, (data for _, data in entries if data is not None))
+    generate_project._write_archive(buf, entries, deflated, comment)
+    return buf.getvalue()
+
+
+class TestWriteArchive:
+    """_write_archive must produce a ZIP that zipfile reads back byte for byte"""
+
+    def test_deflate_is_raw_stream(self):
+        data = b"hello\n" * 100
+        compressed, crc = generate_project._deflate(data)
+
+        assert zlib.decompress(compressed, -zlib.MAX_WBITS) == data
+        assert crc == zlib.crc32(data)
+
+    def test_round_trip(self):
+        entries = (
+            ("pkg/a.txt", b"hello\n" * 100),
+            ("pkg/empty.py", b""),
+            ("top.bin", bytes(range(256))),
+        )
+
+        with zipfile.ZipFile(io.BytesIO(_archive_bytes(entries, b"comment"))) as archive:
+            assert archive.testzip() is None
+            assert archive.comment == b"comment"
+            assert archive.namelist() == [name for name, _ in entries]
+            for name, data in entries:
+                assert archive.read(name) == data
+                assert archive.getinfo(name).compress_type == zipfile.ZIP_DEFLATED
+
+    def test_entry_modes(self):
+        entries = (("pkg/", None), ("pkg/a.txt", b"a"))
+
+        with zipfile.ZipFile(io.BytesIO(_archive_bytes(entries))) as archive:
+            directory, member = archive.infolist()
+            assert directory.is_dir()
+            assert (directory.external_attr >> 16) & 0o777 == 0o755
+            assert not member.is_dir()
+            assert (member.external_attr >> 16) & 0o777 == 0o644
+
+    def test_manifest_round_trip(self, tmp_path):
+        path = tmp_path / "project.zip"
+        generate_project.create_zip(str(path))
+
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
+            for name, data in generate_project.MANIFEST:
+                if data is not None:
+                    assert archive.read(name) == data
+
+    def test_manifest_directories_emitted_once(self, tmp_path):
+        path = tmp_path / "project.zip"
+        generate_project.create_zip(str(path))
+
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+
+        assert len(names) == len(set(names))
+        for name in names:
+            parent = name.rstrip("/").rpartition("/")[0]
+            if parent:
+                # Every parent directory entry comes before its children
+                assert names.index(parent + "/") < names.index(name)
+
+
+class TestCreateZipDigest:
+    """create_zip skips regeneration only when the stored digest matches"""
+
+    def test_digest_stored_as_comment(self, tmp_path):
+        path = tmp_path / "project.zip"
+        generate_project.create_zip(str(path))
+
+        with zipfile.ZipFile(path) as archive:
+            assert archive.comment == generate_project._archive_digest()
+
+    def test_up_to_date_archive_is_not_rewritten(self, tmp_path, monkeypatch):
+        path = tmp_path / "project.zip"
+        generate_project.create_zip(str(path))
+
+        def fail(*args):
+            raise AssertionError("archive rewritten")
+
+        monkeypatch.setattr(generate_project, "_write_archive", fail)
+        generate_project.create_zip(str(path))
+
+    def test_changed_inputs_rebuild(self, tmp_path, monkeypatch):
+        path = tmp_path / "project.zip"
+        generate_project.create_zip(str(path))
+
+        manifest = generate_project.MANIFEST + (("extra.txt", b"new file\n"),)
+        monkeypatch.setattr(generate_project, "MANIFEST", manifest)
+        generate_project.create_zip(str(path))
+
+        with zipfile.ZipFile(path) as archive:
+            assert archive.read("extra.txt") == b"new file\n"
+            assert archive.comment == generate_project._archive_digest()
+
+    def test_corrupt_archive_is_replaced(self, tmp_path):
+        path = tmp_path / "project.zip"
+        path.write_bytes(b"not a zip")
+
+        generate_project.create_zip(str(path))
+
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
@@ -0,0 +1,195 @@
+"""
+Unit tests for the regex fast path in the YOLO+OCR pipeline
+"""
+
+import pytest
+
+from lmpc_checker import main as pipeline
+from lmpc_checker.main import _extract_fields_heuristic, structure_ocr_from_panels
+
+
+class TestExtractFieldsHeuristic:
+    """One test per panel class"""
+
+    def test_mrp_panel(self):
+        fields = _extract_fields_heuristic({"mrp_panel": "MRP ₹ 120.00 (incl. of all taxes)"})
+        assert fields == {"mrp": "MRP ₹ 120.00"}
+
+    def test_mrp_panel_unit_sale_price(self):
+        fields = _extract_fields_heuristic({"mrp_panel": "MRP Rs. 50 Unit price ₹0.24/g"})
+        assert fields["mrp"] == "MRP Rs. 50"
+        assert fields["unit_sale_price"] == "₹0.24/g"
+
+    def test_mrp_panel_without_price(self):
+        assert _extract_fields_heuristic({"mrp_panel": "MRP incl. of all taxes"}) == {}
+
+    def test_net_quantity_panel(self):
+        fields = _extract_fields_heuristic({"net_quantity_panel": "Net Wt. 500 g"})
+        assert fields == {"net_quantity": "500 g"}
+
+    def test_mfg_or_packed_date_panel(self):
+        fields = _extract_fields_heuristic({"mfg_or_packed_date_panel": "Pkd on: 12/03/2024"})
+        assert fields == {"date_of_manufacture": "12/03/2024"}
+
+    def test_best_before_or_expiry_panel(self):
+        fields = _extract_fields_heuristic({"best_before_or_expiry_panel": "Best before 12/2025"})
+        assert fields == {"best_before_date": "12/2025"}
+
+        fields = _extract_fields_heuristic({"best_before_or_expiry_panel": "EXP: Mar 2026"})
+        assert fields == {"expiry_date": "Mar 2026"}
+
+    def test_country_of_origin_panel(self):
+        fields = _extract_fields_heuristic({"country_of_origin_panel": "Made in India"})
+        assert fields == {"country_of_origin": "India"}
+
+    def test_manufacturer_importer_panel(self):
+        fields = _extract_fields_heuristic(
+            {"manufacturer_importer_panel": "Mfd by ABC Foods Pvt Ltd, Mumbai"}
+        )
+        assert fields == {"manufacturer_details": "Mfd by ABC Foods Pvt Ltd, Mumbai"}
+
+        fields = _extract_fields_heuristic(
+            {"manufacturer_importer_panel": "Imported by XYZ Traders, Delhi"}
+        )
+        assert fields == {"importer_details": "Imported by XYZ Traders, Delhi"}
+
+    def test_customer_care_panel(self):
+        fields = _extract_fields_heuristic({"customer_care_panel": "Call 1800-123-4567"})
+        assert fields == {"customer_care_details": "Call 1800-123-4567"}
+
+    def test_brand_product_panel(self):
+        fields = _extract_fields_heuristic({"brand_product_panel": "Tasty SNACK Mix"})
+        assert fields == {"category": "snack"}
+
+    def test_unknown_panel_is_ignored(self):
+        assert _extract_fields_heuristic({"full_image": "MRP Rs. 50 500 g"}) == {}
+
+
+COMPLETE_PANELS = {
+    "mrp_panel": "MRP ₹ 120.00 Unit price ₹0.24/g",
+    "net_quantity_panel": "Net Wt. 500 g",
+    "brand_product_panel": "Tasty Snack Mix",
+    "mfg_or_packed_date_panel": "Pkd: 01/2025",
+    "best_before_or_expiry_panel": "Best before 12/2025",
+    "manufacturer_importer_panel": "Mfd by ABC Foods Pvt Ltd, Mumbai",
+}
+
+
+class TestStructureOcrFromPanels:
+    """The LLM is skipped only when the regexes fill every field the validator needs"""
+
+    @pytest.fixture
+    def llm_calls(self, monkeypatch):
+        calls = []
+
+        def fake_llm(panel_texts):
+            calls.append(dict(panel_texts))
+            return {key: None for key in pipeline._STRUCTURED_KEYS}
+
+        monkeypatch.setattr(pipeline, "_structure_with_llm", fake_llm)
+        return calls
+
+    def test_skips_llm_when_required_fields_found(self, llm_calls):
+        data = structure_ocr_from_panels(COMPLETE_PANELS)
+
+        assert llm_calls == []
+        assert data["mrp"] == "MRP ₹ 120.00"
+        assert data["category"] == "snack"
+        assert data["date_of_import"] is None
+        assert "[MRP_PANEL]" in data["raw_ocr"]
+
+    def test_single_panel_still_calls_llm(self, llm_calls):
+        data = structure_ocr_from_panels({"mrp_panel": "MRP Rs. 50"})
+
+        assert llm_calls == [{"mrp_panel": "MRP Rs. 50"}]
+        # Regex values fill what the LLM left empty
+        assert data["mrp"] == "MRP Rs. 50"
+
+    def test_importer_without_country_calls_llm(self, llm_calls):
+        panels = dict(COMPLETE_PANELS)
+        panels["manufacturer_importer_panel"] = "Imported by XYZ Traders, Delhi"
+        structure_ocr_from_panels(panels)
+        assert len(llm_calls) == 1
+
+        llm_calls.clear()
+        panels["country_of_origin_panel"] = "Country of origin: Japan"
+        structure_ocr_from_panels(panels)
+        assert llm_calls == []
+
+    def test_llm_answers_take_precedence(self, monkeypatch):
+        monkeypatch.setattr(
+            pipeline,
+            "_structure_with_llm",
+            lambda panel_texts: {**{k: None for k in pipeline._STRUCTURED_KEYS}, "mrp": "₹99"},
+        )
+        data = structure_ocr_from_panels({"mrp_panel": "MRP Rs. 50", "net_quantity_panel": "1 L"})
+
+        assert data["mrp"] == "₹99"
+        assert data["net_quantity"] == "1 L"
+
+
+class _FakeInputs(dict):
+    def to(self, device):
+        return self
+
+
+class _FakeIds:
+    shape = (1, 0)
+
+
+class _FakeTokenizer:
+    """Records the prompt and decodes every generation to a canned reply"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompt = None
+
+    def apply_chat_template(self, chat, tokenize, add_generation_prompt):
+        self.prompt = chat[0]["content"]
+        return self.prompt
+
+    def __call__(self, prompt, return_tensors):
+        return _FakeInputs(input_ids=_FakeIds())
+
+    def decode(self, ids, skip_special_tokens):
+        return self.reply
+
+
+class _FakeModel:
+    device = "cpu"
+
+    def generate(self, **kwargs):
+        return [None]
+
+
+class TestStructuredKeys:
+    """The fast path, the LLM path and its fallback all return the same keys"""
+
+    EXPECTED_KEYS = {"raw_ocr", *pipeline._STRUCTURED_KEYS}
+
+    @pytest.fixture
+    def tokenizer(self, monkeypatch):
+        tokenizer = _FakeTokenizer('{"mrp": "₹99"}')
+        monkeypatch.setattr(pipeline, "_load_", lambda: (tokenizer, _FakeModel()))
+        monkeypatch.setattr(pipeline, "_json_stop_criteria", lambda tokenizer, prompt_len: None)
+        return tokenizer
+
+    def test_empty_panels(self):
+        assert set(structure_ocr_from_panels({})) == self.EXPECTED_KEYS
+
+    def test_fast_path(self):
+        assert set(structure_ocr_from_panels(COMPLETE_PANELS)) == self.EXPECTED_KEYS
+
+    def test_llm_path(self, tokenizer):
+        data = pipeline._structure_with_llm({"mrp_panel": "MRP ₹99"})
+
+        assert set(data) == self.EXPECTED_KEYS
+        assert data["mrp"] == "₹99"
+        for key in pipeline._STRUCTURED_KEYS:
+            assert f'- "{key}": string or null' in tokenizer.prompt
+
+    def test_llm_fallback(self, tokenizer):
+        tokenizer.reply = "not json"
+        data = pipeline._structure_with_llm({"mrp_panel": "MRP ₹99"})
+
+        assert data == {"raw_ocr": "[MRP_PANEL]\nMRP ₹99", **dict.fromkeys(pipeline._STRUCTURED_KEYS)}
@@ -0,0 +1,147 @@
+"""
+Unit tests for panel cropping and OCR in the YOLO+OCR pipeline
+"""
+
+import logging
+import sys
+import threading
+
+import pytest
+from PIL import Image
+
+from lmpc_checker import main as pipeline
+from lmpc_checker.main import CLASSES, extract_panel_texts
+
+MRP = CLASSES.index("mrp_panel")
+NET_QUANTITY = CLASSES.index("net_quantity_panel")
+
+BOXES = {
+    MRP: [(0, 0, 10, 10), (10, 0, 30, 10)],
+    NET_QUANTITY: [(0, 10, 40, 30)],
+    len(CLASSES): [(0, 0, 5, 5)],  # unknown class id, ignored
+}
+
+
+def _text_for(crop):
+    return "text %dx%d" % crop.size
+
+
+@pytest.fixture
+def image():
+    return Image.new("RGB", (64, 64), "white")
+
+
+@pytest.fixture
+def tesseract_calls(monkeypatch):
+    """Replace pytesseract with a fake that records the thread of each call"""
+    calls = []
+
+    def fake_tesseract(crop):
+        calls.append(threading.current_thread())
+        return _text_for(crop)
+
+    monkeypatch.setattr(pipeline, "_ocr_with_tesseract", fake_tesseract)
+    return calls
+
+
+@pytest.fixture
+def surya_loaded(monkeypatch):
+    monkeypatch.setattr(pipeline, "_surya_models", ("loaded",))
+
+
+def _fail_batch(crops):
+    raise AssertionError("Surya called after it was marked unavailable")
+
+
+EXPECTED = {
+    "mrp_panel": "text 10x10\ntext 20x10",
+    "net_quantity_panel": "text 40x20",
+}
+
+
+class TestSuryaBatching:
+    """All crops go to Surya in one call; tesseract only fills the gaps"""
+
+    def test_single_batch_call(self, image, surya_loaded, tesseract_calls, monkeypatch):
+        batches = []
+
+        def fake_batch(crops):
+            batches.append(len(crops))
+            return [_text_for(crop) for crop in crops]
+
+        monkeypatch.setattr(pipeline, "_batch_surya_ocr", fake_batch)
+
+        assert extract_panel_texts(image, BOXES) == EXPECTED
+        assert batches == [3]
+        assert tesseract_calls == []
+
+    def test_empty_surya_text_falls_back_per_crop(self, image, surya_loaded, tesseract_calls, monkeypatch):
+        monkeypatch.setattr(
+            pipeline, "_batch_surya_ocr",
+            lambda crops: [None] + [_text_for(crop) for crop in crops[1:]],
+        )
+
+        assert extract_panel_texts(image, BOXES) == EXPECTED
+        assert len(tesseract_calls) == 1
+
+    def test_failed_batch_retries_one_by_one(self, image, surya_loaded, tesseract_calls, monkeypatch, caplog):
+        def fake_batch(crops):
+            if len(crops) > 1:
+                raise RuntimeError("out of memory")
+            return [_text_for(crops[0])]
+
+        monkeypatch.setattr(pipeline, "_batch_surya_ocr", fake_batch)
+
+        with caplog.at_level(logging.WARNING, logger=pipeline.logger.name):
+            assert extract_panel_texts(image, BOXES) == EXPECTED
+
+        assert tesseract_calls == []
+        assert "Batched Surya OCR failed" in caplog.text
+
+    def test_no_boxes(self, image, monkeypatch):
+        monkeypatch.setattr(pipeline, "_batch_surya_ocr", _fail_batch)
+        assert extract_panel_texts(image, {}) == {}
+
+
+class TestSuryaUnavailable:
+    """Once Surya fails to load, every image goes straight to tesseract"""
+
+    def test_unavailable_skips_batching(self, image, tesseract_calls, monkeypatch, caplog):
+        monkeypatch.setattr(pipeline, "_surya_models", pipeline._SURYA_UNAVAILABLE)
+        monkeypatch.setattr(pipeline, "_batch_surya_ocr", _fail_batch)
+
+        with caplog.at_level(logging.WARNING, logger=pipeline.logger.name):
+            assert extract_panel_texts(image, BOXES) == EXPECTED
+
+        assert len(tesseract_calls) == 3
+        assert caplog.records == []
+
+    def test_failed_load_warns_once(self, image, tesseract_calls, monkeypatch, caplog):
+        monkeypatch.setattr(pipeline, "_surya_models", None)
+        monkeypatch.setitem(sys.modules, "surya", None)  # import fails
+
+        with caplog.at_level(logging.WARNING, logger=pipeline.logger.name):
+            for _ in range(3):
+                assert extract_panel_texts(image, BOXES) == EXPECTED
+
+        assert pipeline._surya_models is pipeline._SURYA_UNAVAILABLE
+        assert [r.getMessage().split(";")[0] for r in caplog.records] == ["Surya OCR unavailable"]
+        assert len(tesseract_calls) == 9
+
+    def test_tesseract_runs_on_worker_threads(self, image, tesseract_calls, monkeypatch):
+        monkeypatch.setattr(pipeline, "_surya_models", pipeline._SURYA_UNAVAILABLE)
+        boxes = {MRP: [(0, 0, width, 8) for width in range(1, 7)]}
+
+        texts = extract_panel_texts(image, boxes)
+
+        # Box order within a class survives the concurrent map
+        assert texts == {"mrp_panel": "\n".join("text %dx8" % width for width in range(1, 7))}
+        assert len(tesseract_calls) == 6
+        assert threading.main_thread() not in tesseract_calls
+
+    def test_run_ocr_on_panel_skips_surya(self, image, tesseract_calls, monkeypatch):
+        monkeypatch.setattr(pipeline, "_surya_models", pipeline._SURYA_UNAVAILABLE)
+        monkeypatch.setattr(pipeline, "_batch_surya_ocr", _fail_batch)
+
+        assert pipeline.run_ocr_on_panel(image) == "text 64x64"
+        assert tesseract_calls == [threading.main_thread()]
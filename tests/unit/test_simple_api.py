@@ -0,0 +1,396 @@
+"""
+Unit tests for the deployed ML API (deploy_package/simple_api.py)
+"""
+
+import asyncio
+import importlib
+import io
+import os
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("fastapi")
+pytest.importorskip("huggingface_hub")
+pytest.importorskip("orjson")
+pytest.importorskip("dotenv")
+pytest.importorskip("httpx")
+
+# deploy_package is not a package; import simple_api from its directory
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "deploy_package"))
+os.environ.setdefault("HF_TOKEN", "test-token")
+
+import simple_api  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def _found_fields_substring(text):
+    """The original per-field substring scan that _KEYWORD_RE replaces"""
+    text_lower = text.lower()
+    return {
+        field
+        for field, keywords in simple_api.REQUIRED_FIELDS
+        if any(kw in text_lower for kw in keywords)
+    }
+
+
+def _found_fields_regex(text):
+    return {
+        simple_api._KEYWORD_FIELD[m.group(1)]
+        for m in simple_api._KEYWORD_RE.finditer(text.lower())
+    }
+
+
+class TestKeywordRegex:
+    """_KEYWORD_RE must find exactly the fields the substring scan found"""
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "MRP Rs. 50 Net Wt 500g",
+        "Manufactured by ABC, Made in India, Customer Care 1800",
+        "mfg: 01/24 mfd date dom",
+        "Marketed by XYZ; net content 1L; ₹ 99; email: a@b.c",
+        "no label text here",
+    ])
+    def test_known_labels(self, text):
+        assert _found_fields_regex(text) == _found_fields_substring(text)
+
+    def test_overlapping_keywords(self):
+        # Keywords sharing a prefix ("mfd by"/"mfd date", "rs"/"rs.") must all count
+        text = "MFD BY: mfd date mrp rs.rs 1"
+        assert _found_fields_regex(text) == _found_fields_substring(text)
+
+    def test_random_keyword_soup(self):
+        keywords = [kw for _, kws in simple_api.REQUIRED_FIELDS for kw in kws]
+        alphabet = list("abcdefghijklmnoprstuy .:₹")
+        rng = random.Random(1)
+        for _ in range(2000):
+            parts = []
+            for _ in range(rng.randint(0, 6)):
+                if rng.random() < 0.5:
+                    parts.append(rng.choice(keywords))
+                else:
+                    parts.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 5))))
+            text = "".join(parts)
+            if rng.random() < 0.3:
+                text = text.upper()
+            assert _found_fields_regex(text) == _found_fields_substring(text), text
+
+    def test_score_and_violations(self):
+        result = simple_api._check_compliance_text("MRP Rs 50, Net Qty 1kg, Made in India")
+
+        assert result["success"] is True
+        assert result["fields_found"] == 3
+        assert result["score"] == 50.0
+        assert {v["field"] for v in result["violations"]} == {
+            "Manufacturer Name & Address", "Consumer Care Details", "Date of Manufacture",
+        }
+
+
+def _allowed_origin(app, origin):
+    response = TestClient(app).get("/health", headers={"Origin": origin})
+    return response.headers.get("access-control-allow-origin")
+
+
+class TestCors:
+    """ALLOWED_ORIGIN_REGEX accepts the deployed frontends, and anything in development"""
+
+    @pytest.mark.parametrize("origin", [
+        "https://bharatvision.streamlit.app",
+        "https://preview-1.streamlit.app",
+        "http://localhost:8501",
+        "http://localhost:3000",
+        "http://127.0.0.1:8501",
+    ])
+    def test_known_origins(self, origin):
+        assert _allowed_origin(simple_api.app, origin) == origin
+
+    @pytest.mark.parametrize("origin", [
+        "http://localhost:8080",
+        "https://streamlit.app.evil.com",
+        "http://bharatvision.streamlit.app",
+    ])
+    def test_other_origins_rejected(self, origin):
+        assert _allowed_origin(simple_api.app, origin) is None
+
+    def test_development_allows_any_origin(self, monkeypatch):
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        try:
+            dev_api = importlib.reload(simple_api)
+            response = TestClient(dev_api.app).get("/health", headers={"Origin": "http://localhost:8080"})
+        finally:
+            monkeypatch.delenv("ENVIRONMENT")
+            importlib.reload(simple_api)
+
+        assert response.headers["access-control-allow-origin"] == "http://localhost:8080"
+        assert response.headers["access-control-allow-credentials"] == "true"
+
+
+class TestEtagMatches:
+    """If-None-Match parsing per RFC 9110"""
+
+    ETAG = b'"abc123"'
+
+    @pytest.mark.parametrize("header", [
+        b'"abc123"',
+        b'W/"abc123"',
+        b'*',
+        b'"other", "abc123"',
+        b'"other",W/"abc123"',
+        b'  "abc123"  ',
+    ])
+    def test_matches(self, header):
+        assert simple_api._etag_matches(header, self.ETAG)
+
+    @pytest.mark.parametrize("header", [
+        b'',
+        b'"other"',
+        b'abc123',
+        b'"abc1234"',
+        b'"other", W/"abc"',
+    ])
+    def test_does_not_match(self, header):
+        assert not simple_api._etag_matches(header, self.ETAG)
+
+
+class TestConditionalGet:
+    """ConditionalGetMiddleware adds validators and answers revalidations with 304"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(simple_api.app)
+
+    def test_etag_and_cache_control(self, client):
+        response = client.get("/api/dashboard/stats")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "public, max-age=30"
+        assert int(response.headers["content-length"]) == len(response.content)
+
+    @pytest.mark.parametrize("path", ["/health", "/api/dashboard/stats", "/api/search/products?q=tea"])
+    def test_not_modified(self, client, path):
+        etag = client.get(path).headers["etag"]
+
+        for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+            response = client.get(path, headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+            assert "content-type" not in response.headers
+
+    def test_stale_etag_gets_full_response(self, client):
+        response = client.get("/api/dashboard/stats", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.json()["total_scans"] == 332
+
+    def test_etag_follows_body(self, client):
+        tea = client.get("/api/search/products?q=tea").headers["etag"]
+        honey = client.get("/api/search/products?q=honey").headers["etag"]
+        assert tea != honey
+
+    def test_other_routes_untouched(self, client):
+        response = client.post("/api/compliance/check", json={"text": "MRP Rs 50"})
+        assert "etag" not in response.headers
+
+    def test_non_200_passes_through(self):
+        async def not_found(scope, receive, send):
+            await send({"type": "http.response.start", "status": 404, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"missing"})
+
+        client = TestClient(simple_api.ConditionalGetMiddleware(not_found))
+        response = client.get("/health", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 404
+        assert response.content == b"missing"
+        assert "etag" not in response.headers
+
+
+def _image_bytes(size, fmt="PNG", orientation=None):
+    image = Image.new("RGB", size, "white")
+    # Mark the top-left corner so rotations are observable
+    image.paste((255, 0, 0), (0, 0, 10, 10))
+    buf = io.BytesIO()
+    if orientation is None:
+        image.save(buf, fmt)
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(buf, fmt, exif=exif)
+    return buf.getvalue()
+
+
+class TestDownscaleImage:
+    """_downscale_image shrinks large or rotated uploads and reports the scale"""
+
+    def test_small_upright_image_untouched(self):
+        contents = _image_bytes((100, 50))
+        assert simple_api._downscale_image(contents, (800, 800)) == (contents, 1.0)
+
+    def test_large_image_shrinks_to_fit(self):
+        small, scale = simple_api._downscale_image(_image_bytes((1600, 400)), (800, 800))
+        image = Image.open(io.BytesIO(small))
+
+        assert image.format == "JPEG"
+        assert image.size == (800, 200)
+        assert scale == 2.0
+
+    def test_non_rgb_image_is_converted(self):
+        buf = io.BytesIO()
+        Image.new("RGBA", (1000, 1000)).save(buf, "PNG")
+
+        small, scale = simple_api._downscale_image(buf.getvalue(), (500, 500))
+
+        assert Image.open(io.BytesIO(small)).mode == "RGB"
+        assert scale == 2.0
+
+    def test_exif_rotation_is_applied(self):
+        # Orientation 6: stored landscape, displayed rotated 90 degrees clockwise
+        contents = _image_bytes((200, 100), "JPEG", orientation=6)
+
+        small, scale = simple_api._downscale_image(contents, (800, 800))
+        image = Image.open(io.BytesIO(small))
+
+        assert small != contents
+        assert image.size == (100, 200)
+        assert image.getexif().get(0x0112, 1) == 1
+        # The stored top-left corner is displayed top-right
+        red, green, _ = image.getpixel((95, 4))
+        assert red > 200 and green < 60
+        assert scale == 1.0
+
+    def test_rotated_large_image_scale_uses_upright_width(self):
+        contents = _image_bytes((1600, 400), "JPEG", orientation=6)
+
+        small, scale = simple_api._downscale_image(contents, (800, 800))
+
+        assert Image.open(io.BytesIO(small)).size == (200, 800)
+        assert scale == 2.0
+
+
+class TestRescaleDetections:
+    """_rescale_detections maps boxes back to original pixel coordinates"""
+
+    def test_dict_boxes(self):
+        detections = [
+            {"label": "bottle", "box": {"xmin": 10, "ymin": 5, "xmax": 21, "ymax": 40}},
+            {"label": "no box"},
+        ]
+
+        simple_api._rescale_detections(detections, 2.5)
+
+        assert detections[0]["box"] == {"xmin": 25, "ymin": 12, "xmax": 52, "ymax": 100}
+        assert detections[1] == {"label": "no box"}
+
+    def test_object_boxes(self):
+        box = SimpleNamespace(xmin=10, ymin=5, xmax=20, ymax=40)
+        detections = [SimpleNamespace(label="bottle", box=box), SimpleNamespace(label="none", box=None)]
+
+        simple_api._rescale_detections(detections, 2.0)
+
+        assert (box.xmin, box.ymin, box.xmax, box.ymax) == (20, 10, 40, 80)
+
+    def test_unit_scale_is_identity(self):
+        detections = [{"box": {"xmin": 1.4, "ymin": 0, "xmax": 2, "ymax": 3}}]
+        assert simple_api._rescale_detections(detections, 1.0) is detections
+        assert detections[0]["box"]["xmin"] == 1.4
+
+
+class _FakeInferenceClient:
+    """Stands in for AsyncInferenceClient; OCR answers only once detection is in flight"""
+
+    def __init__(self, text="MRP Rs 50 Net Wt 500g", ocr_error=None):
+        self.text = text
+        self.ocr_error = ocr_error
+        self.detection_started = asyncio.Event()
+        self.detection_cancelled = False
+
+    async def image_to_text(self, image, model):
+        await asyncio.wait_for(self.detection_started.wait(), 5)
+        if self.ocr_error:
+            raise self.ocr_error
+        return self.text
+
+    async def object_detection(self, image, model):
+        self.detection_started.set()
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.detection_cancelled = True
+            raise
+        return [{"label": "bottle", "score": 0.9, "box": {"xmin": 10, "ymin": 10, "xmax": 20, "ymax": 20}}]
+
+
+class TestProcessImageFull:
+    """OCR and detection overlap; detection failures degrade, OCR failures cancel it"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_ocr_cache(self, monkeypatch):
+        monkeypatch.setattr(simple_api, "_ocr_cache", simple_api.OrderedDict())
+
+    def _post(self, contents=None):
+        contents = contents or _image_bytes((1600, 400))
+        return TestClient(simple_api.app).post(
+            "/api/process/image", files={"file": ("label.png", contents, "image/png")}
+        )
+
+    def test_success(self, monkeypatch):
+        fake = _FakeInferenceClient()
+        monkeypatch.setattr(simple_api, "client", fake)
+
+        body = self._post().json()
+
+        assert body["success"] is True
+        assert body["text"] == fake.text
+        assert body["compliance"] == simple_api._check_compliance_text(fake.text)
+        # Boxes come back in original pixels (1600px image sent at 800px)
+        assert body["detection"]["detections"][0]["box"] == {"xmin": 20, "ymin": 20, "xmax": 40, "ymax": 40}
+
+    def test_missing_client(self, monkeypatch):
+        monkeypatch.setattr(simple_api, "client", None)
+        assert self._post().status_code == 503
+
+    def test_ocr_failure_cancels_detection(self, monkeypatch):
+        fake = _FakeInferenceClient(ocr_error=RuntimeError("model loading"))
+        monkeypatch.setattr(simple_api, "client", fake)
+
+        body = self._post().json()
+
+        assert body["success"] is False
+        assert body["error"] == "OCR failed"
+        assert fake.detection_cancelled
+
+    def test_ocr_exception_cancels_detection(self, monkeypatch):
+        fake = _FakeInferenceClient()
+        monkeypatch.setattr(simple_api, "client", fake)
+
+        async def broken_ocr(contents):
+            await asyncio.wait_for(fake.detection_started.wait(), 5)
+            raise ValueError("boom")
+
+        monkeypatch.setattr(simple_api, "_ocr_from_bytes", broken_ocr)
+
+        response = self._post()
+
+        assert response.status_code == 500
+        assert fake.detection_cancelled
+
+    def test_detection_error_degrades(self, monkeypatch):
+        fake = _FakeInferenceClient()
+        monkeypatch.setattr(simple_api, "client", fake)
+
+        async def broken_detect(contents):
+            fake.detection_started.set()
+            raise ValueError("detector down")
+
+        monkeypatch.setattr(simple_api, "_detect_from_bytes", broken_detect)
+
+        body = self._post().json()
+
+        assert body["success"] is True
+        assert body["detection"] == {"success": False, "detections": [], "error": "detector down"}
+        assert body["text"] == fake.text